@@ -4,6 +4,13 @@ from agents.config import SECTORS, AGENT_DESIGNATIONS
 from agents.company_agent import CompanyCoverageAgent
 from agents.sector_agent import SectorLeadAgent
 from agents.orchestrator import KabutenOrchestrator
+from agents.history import FindingsStore
+from agents.checkpoint import RunManifest
+from agents.work_queue import WorkQueue, SQLiteWorkQueue
+from agents.budget import TokenBudget, BudgetExceeded, AnswerTruncated
+from agents.cache import ResponseCache
+from agents.brief import BriefStore, SectorBrief
+from agents.profiling import LoopProfiler
 
 __all__ = [
     "SECTORS",
@@ -11,4 +18,15 @@ __all__ = [
     "CompanyCoverageAgent",
     "SectorLeadAgent",
     "KabutenOrchestrator",
+    "FindingsStore",
+    "RunManifest",
+    "WorkQueue",
+    "SQLiteWorkQueue",
+    "TokenBudget",
+    "BudgetExceeded",
+    "AnswerTruncated",
+    "ResponseCache",
+    "BriefStore",
+    "SectorBrief",
+    "LoopProfiler",
 ]
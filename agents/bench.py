@@ -0,0 +1,502 @@
+"""
+Synthetic load benchmarks for the agent tree — no API calls, no API spend.
+
+FakeModelClient stands in for `anthropic.Anthropic()` via the client factory.
+It mimics `messages.create`: seeded log-normal base latency, extra delay for
+thinking budgets and web-search uses, occasional rate-limit errors, per-request
+timeouts, and well-formed JSON findings/syntheses. Like the real SDK client it blocks the
+calling thread, so event-loop stalls show up exactly as they would live.
+
+    python -m agents.bench                                  # all scenarios, live + synthetic scale
+    python -m agents.bench --scenario sweep --scale live --time-scale 0.01
+    python -m agents.bench --json bench.json
+    python -m agents.bench --scenario sweep --profile         # attribute loop stalls to call sites
+    python -m agents.bench --scenario encoding --scale synthetic  # findings memory/serialisation
+
+All delays are multiplied by --time-scale (default 0.001: one simulated
+second sleeps one millisecond). Reported times are real measured times.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+
+from agents import encoding
+from agents.cassette import request_key
+from agents.client import use_client_factory
+from agents.company_agent import CompanyFinding
+from agents.config import SECTORS, CompanyDef, SectorDef
+from agents.orchestrator import KabutenOrchestrator
+from agents.profiling import LoopProfiler
+from agents.sector_agent import SectorSynthesis
+
+
+# ── Fake model server ──
+
+@dataclass
+class LatencyProfile:
+    """Simulated latency/error characteristics of the model API (seconds, pre time-scale)."""
+    base_median: float = 6.0
+    base_sigma: float = 0.5
+    thinking_per_1k: float = 1.5
+    web_search: float = 2.5
+    rate_limit_rate: float = 0.0
+    escalation_rate: float = 0.05
+    time_scale: float = 0.001
+
+
+class FakeRateLimitError(Exception):
+    """Raised in place of anthropic.RateLimitError."""
+    status_code = 429
+
+
+@dataclass
+class CallStats:
+    """Per-call latencies (seconds) by call kind, shared by every fake client in a run."""
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, kind: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.latencies.setdefault(kind, []).append(seconds)
+            if error:
+                self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+class _FakeMessages:
+    def __init__(self, server: "FakeModelServer"):
+        self._server = server
+
+    def create(self, **request):
+        return self._server.respond(request)
+
+
+class FakeModelClient:
+    """Drop-in for anthropic.Anthropic() — only `messages.create` is implemented."""
+
+    def __init__(self, server: "FakeModelServer"):
+        self.messages = _FakeMessages(server)
+        self.beta = SimpleNamespace(messages=self.messages)
+
+
+class FakeModelServer:
+    """Deterministic response generator shared by all fake clients in a run."""
+
+    def __init__(self, profile: LatencyProfile, seed: int = 0):
+        self.profile = profile
+        self.seed = seed
+        self.stats = CallStats()
+        self._seen: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def client(self) -> FakeModelClient:
+        return FakeModelClient(self)
+
+    def respond(self, request: dict):
+        kind = self._classify(request)
+        # Seeded like a cassette key: no date header, no budget-sized token limits
+        digest = request_key(request)
+        with self._lock:
+            n = self._seen.get(digest, 0)
+            self._seen[digest] = n + 1
+        rng = random.Random(f"{self.seed}:{digest}:{n}")
+
+        p = self.profile
+        delay = rng.lognormvariate(math.log(p.base_median), p.base_sigma)
+        thinking = request.get("thinking") or {}
+        delay += thinking.get("budget_tokens", 0) / 1000 * p.thinking_per_1k
+        for tool in request.get("tools") or []:
+            delay += rng.randint(0, tool.get("max_uses", 1)) * p.web_search
+
+        start = time.perf_counter()
+        timeout = request.get("timeout")
+        if timeout is not None and delay * p.time_scale > timeout:
+            # Like the SDK: the request is cut off once its timeout elapses
+            time.sleep(timeout)
+            self.stats.record(kind, time.perf_counter() - start, error=True)
+            raise TimeoutError("simulated request timeout")
+        time.sleep(delay * p.time_scale)
+        if rng.random() < p.rate_limit_rate:
+            self.stats.record(kind, time.perf_counter() - start, error=True)
+            raise FakeRateLimitError("rate_limit_error: simulated 429")
+
+        text = self._body(kind, rng)
+        # Like the API: an answer longer than max_tokens (less thinking) is cut off
+        answer_limit = request.get("max_tokens", math.inf) - thinking.get("budget_tokens", 0)
+        stop_reason = "end_turn"
+        if len(text) // 4 > answer_limit:
+            text, stop_reason = text[: int(answer_limit) * 4], "max_tokens"
+        self.stats.record(kind, time.perf_counter() - start)
+        prompt_chars = len(json.dumps(request.get("messages", []))) + len(request.get("system", "") or "")
+        return SimpleNamespace(
+            id=f"msg_fake_{digest[:12]}_{n}",
+            model=request.get("model"),
+            stop_reason=stop_reason,
+            content=[
+                SimpleNamespace(type="thinking", thinking="(simulated reasoning)"),
+                SimpleNamespace(type="text", text=text),
+            ],
+            usage=SimpleNamespace(input_tokens=prompt_chars // 4, output_tokens=len(text) // 4),
+        )
+
+    @staticmethod
+    def _classify(request: dict) -> str:
+        if request.get("tools"):
+            budget = (request.get("thinking") or {}).get("budget_tokens", 0)
+            return "escalation" if budget > 1024 else "sweep"
+        if request.get("system"):
+            return "chat"
+        return "synthesis"
+
+    def _body(self, kind: str, rng: random.Random) -> str:
+        if kind in ("sweep", "escalation"):
+            material = rng.random() < 0.1
+            return "Findings below.\n" + json.dumps({
+                "finding_type": "material" if material else rng.choice(["none", "incremental"]),
+                "headline": f"Synthetic headline {rng.randint(0, 10**6)}",
+                "detail": " ".join(["detail"] * rng.randint(20, 120)),
+                "signal": rng.choice(["bullish", "neutral", "bearish", "watch", "risk"]),
+                "category": rng.choice(["earnings", "product", "regulatory", "competitive", "macro"]),
+                "requires_escalation": kind == "sweep" and rng.random() < self.profile.escalation_rate,
+                "assessment": " ".join(["assessment"] * rng.randint(10, 80)),
+                "sources": [f"source-{i}" for i in range(rng.randint(0, 4))],
+            })
+        if kind == "synthesis":
+            return json.dumps({
+                "posture": rng.choice(["bullish", "neutral", "bearish"]),
+                "conviction": rng.randint(0, 10),
+                "thesis_summary": " ".join(["thesis"] * rng.randint(30, 120)),
+                "key_drivers": [f"driver {i}" for i in range(3)],
+                "key_risks": [f"risk {i}" for i in range(3)],
+            })
+        return "OC, " + " ".join(["analysis"] * rng.randint(50, 400))
+
+
+# ── Measurement ──
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+@dataclass
+class BenchReport:
+    scenario: str
+    scale: str
+    sectors: int
+    companies: int
+    wall_s: float
+    calls: dict[str, int]
+    errors: dict[str, int]
+    p50_ms: dict[str, float]
+    p99_ms: dict[str, float]
+    peak_mem_mb: float
+    loop_lag_max_ms: float
+    loop_lag_p99_ms: float
+    loop_profile: dict | None = None  # LoopProfiler summary when run with --profile
+
+    def format(self) -> str:
+        lines = [
+            f"{self.scenario} @ {self.scale} ({self.sectors} sectors / {self.companies} companies)",
+            f"  wall {self.wall_s:.2f}s  peak mem {self.peak_mem_mb:.1f} MB  "
+            f"loop lag p99 {self.loop_lag_p99_ms:.1f} ms / max {self.loop_lag_max_ms:.1f} ms",
+        ]
+        for kind in sorted(self.calls):
+            lines.append(
+                f"  {kind:<11} calls {self.calls[kind]:>5}  errors {self.errors.get(kind, 0):>4}  "
+                f"p50 {self.p50_ms[kind]:8.2f} ms  p99 {self.p99_ms[kind]:8.2f} ms"
+            )
+        if self.loop_profile:
+            lines.append(
+                f"  loop blocked {self.loop_profile['blocked_s']:.2f}s over {self.loop_profile['stalls']} stalls; "
+                f"loop thread busy {self.loop_profile['busy_pct']:.0f}%"
+            )
+            for row in self.loop_profile["worst_offenders"][:5]:
+                lines.append(
+                    f"    {row['total_s']:7.3f}s ×{row['count']:<4} {row['coroutine']} → {row['site']} [{row['leaf']}]"
+                )
+        return "\n".join(lines)
+
+
+# ── Scenarios ──
+
+def synthetic_sectors(n_sectors: int = 100, n_companies: int = 2000) -> dict[str, SectorDef]:
+    """Synthetic sector map with companies spread evenly across sectors."""
+    sectors: dict[str, SectorDef] = {}
+    for i in range(n_sectors):
+        key = f"synthetic_{i:03d}"
+        sectors[key] = SectorDef(
+            key=key,
+            designation=f"SYN{i:03d}",
+            name=f"Synthetic Sector {i}",
+            colour="#64748b",
+            system_context=f"Synthetic benchmark sector {i}.",
+        )
+    keys = list(sectors)
+    for j in range(n_companies):
+        sectors[keys[j % n_sectors]].companies.append(
+            CompanyDef(f"S{j:05d}", "BENCH", f"Synthetic Co {j}")
+        )
+    return sectors
+
+
+SCALES = {
+    "live": lambda: SECTORS,
+    "synthetic": synthetic_sectors,
+}
+
+
+async def _drive(scenario: str, orchestrator: KabutenOrchestrator, chats_per_sector: int) -> None:
+    if scenario in ("sweep", "escalation"):
+        await orchestrator.run_all_sweeps()
+    elif scenario == "chat":
+        await asyncio.gather(
+            *[
+                orchestrator.chat(key, f"OC question {n}: what's the view today?")
+                for key in orchestrator.all_agents()
+                for n in range(chats_per_sector)
+            ],
+            return_exceptions=True,
+        )
+    else:
+        raise ValueError(f"Unknown scenario '{scenario}'")
+
+
+async def _measured(
+    scenario: str,
+    orchestrator: KabutenOrchestrator,
+    chats_per_sector: int,
+    profiler: LoopProfiler,
+) -> float:
+    await profiler.start()
+    start = time.perf_counter()
+    await _drive(scenario, orchestrator, chats_per_sector)
+    wall = time.perf_counter() - start
+    await profiler.stop()
+    return wall
+
+
+def run_benchmark(
+    scenario: str = "sweep",
+    scale: str = "live",
+    profile: LatencyProfile | None = None,
+    seed: int = 0,
+    chats_per_sector: int = 3,
+    profile_loop: bool = False,
+) -> BenchReport:
+    """Run one scenario against the fake model server and return its report."""
+    profile = profile or LatencyProfile()
+    if scenario == "escalation":
+        profile = LatencyProfile(**{**asdict(profile), "escalation_rate": 1.0})
+    server = FakeModelServer(profile, seed=seed)
+    sectors = SCALES[scale]()
+
+    tracemalloc.start()
+    try:
+        with use_client_factory(server.client):
+            orchestrator = KabutenOrchestrator(sectors=sectors, profile=False)
+            # Loop lag always comes from the profiler's heartbeat; stall attribution is reported with --profile
+            profiler = LoopProfiler(scenario)
+            wall = asyncio.run(_measured(scenario, orchestrator, chats_per_sector, profiler))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = server.stats
+    return BenchReport(
+        scenario=scenario,
+        scale=scale,
+        sectors=len(sectors),
+        companies=sum(len(s.companies) for s in sectors.values()),
+        wall_s=wall,
+        calls={k: len(v) for k, v in stats.latencies.items()},
+        errors=dict(stats.errors),
+        p50_ms={k: percentile(v, 50) * 1000 for k, v in stats.latencies.items()},
+        p99_ms={k: percentile(v, 99) * 1000 for k, v in stats.latencies.items()},
+        peak_mem_mb=peak / 1e6,
+        loop_lag_max_ms=max(profiler.report.lags, default=0.0) * 1000,
+        loop_lag_p99_ms=profiler.report.lag_ms(99),
+        loop_profile=profiler.report.to_dict() if profile_loop else None,
+    )
+
+
+# ── Findings representation ──
+
+@dataclass
+class _LegacyFinding:
+    """The pre-slots CompanyFinding layout, kept for before/after comparisons."""
+
+    ticker: str
+    company_name: str
+    finding_type: str
+    headline: str
+    detail: str
+    signal: str
+    category: str
+    requires_escalation: bool
+    assessment: str
+    sources: list[str]
+
+
+_SUMMARY_FIELDS = ("ticker", "company_name", "finding_type", "headline", "detail", "signal", "category", "assessment")
+
+
+@dataclass
+class EncodingReport:
+    scale: str
+    sectors: int
+    companies: int
+    uses: int  # encodings per run: checkpoint, queue result, API
+    encoder: str  # "orjson" or "json"
+    legacy_mem_mb: float
+    compact_mem_mb: float
+    legacy_encode_ms: float
+    compact_first_encode_ms: float
+    compact_cached_encode_ms: float
+    decode_ms: float
+    encoded_mb: float
+
+    def format(self) -> str:
+        return "\n".join([
+            f"encoding @ {self.scale} ({self.sectors} sectors / {self.companies} companies, "
+            f"{self.uses} uses per run, {self.encoder})",
+            f"  retained memory   legacy {self.legacy_mem_mb:7.2f} MB   compact {self.compact_mem_mb:7.2f} MB",
+            f"  encode per run    legacy {self.legacy_encode_ms:7.2f} ms   compact {self.compact_first_encode_ms:7.2f} ms "
+            f"first / {self.compact_cached_encode_ms:.2f} ms cached",
+            f"  decode {self.decode_ms:.2f} ms  encoded size {self.encoded_mb:.2f} MB",
+        ])
+
+
+def _traced(build):
+    """(result, bytes newly retained by building it)."""
+    before, _ = tracemalloc.get_traced_memory()
+    result = build()
+    after, _ = tracemalloc.get_traced_memory()
+    return result, after - before
+
+
+def run_encoding_benchmark(scale: str = "synthetic", seed: int = 0, uses: int = 3) -> EncodingReport:
+    """Memory and serialisation cost of one run's findings, legacy dicts vs shared slotted objects."""
+    sectors = SCALES[scale]()
+    server = FakeModelServer(LatencyProfile(), seed=seed)
+    rng = random.Random(seed)
+    raw = {
+        key: [
+            {"ticker": c.ticker, "company_name": c.name, **json.loads(server._body("sweep", rng).split("\n", 1)[1])}
+            for c in sector.companies
+        ]
+        for key, sector in sectors.items()
+    }
+
+    def summaries(findings: list[_LegacyFinding]) -> list[dict]:
+        return [{k: getattr(f, k) for k in _SUMMARY_FIELDS} for f in findings]
+
+    def legacy():
+        # Old pipeline: the finding, plus a summary dict each for the thread, company_signals and material_findings
+        out = {}
+        for key, rows in raw.items():
+            findings = [_LegacyFinding(**r) for r in rows]
+            material = [f for f in findings if f.finding_type == "material"]
+            out[key] = (findings, summaries(findings), summaries(findings), summaries(material))
+        return out
+
+    def compact():
+        # Thread keeps one summary dict per finding; the synthesis shares the finding objects
+        out = {}
+        for key, rows in raw.items():
+            findings = tuple(CompanyFinding.from_dict(r) for r in rows)
+            synthesis = SectorSynthesis(
+                sector_key=key, designation=sectors[key].designation, posture="neutral", conviction=5.0,
+                thesis_summary="", key_drivers=(), key_risks=(), company_signals=findings,
+                material_findings=tuple(f for f in findings if f.finding_type == "material"),
+            )
+            out[key] = ([f.summary() for f in findings], synthesis)
+        return out
+
+    tracemalloc.start()
+    try:
+        legacy_state, legacy_bytes = _traced(legacy)
+        compact_state, compact_bytes = _traced(compact)
+    finally:
+        tracemalloc.stop()
+
+    # Same encoder on both paths, so the comparison isolates the representation change
+    start = time.perf_counter()
+    for _ in range(uses):
+        for findings, signals, _, material in legacy_state.values():
+            for f in findings:
+                encoding.dumps(asdict(f))
+            encoding.dumps({"company_signals": signals, "material_findings": material})
+    legacy_s = time.perf_counter() - start
+
+    timings = []
+    for _ in range(uses):
+        start = time.perf_counter()
+        encoded = []
+        for _, synthesis in compact_state.values():
+            encoded.extend(f.to_json() for f in synthesis.company_signals)
+            encoded.append(synthesis.to_json())
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _, synthesis in compact_state.values():
+        SectorSynthesis.from_dict(encoding.loads(synthesis.to_json()))
+    decode_s = time.perf_counter() - start
+
+    return EncodingReport(
+        scale=scale,
+        sectors=len(sectors),
+        companies=sum(len(s.companies) for s in sectors.values()),
+        uses=uses,
+        encoder="orjson" if encoding.orjson is not None else "json",
+        legacy_mem_mb=legacy_bytes / 1e6,
+        compact_mem_mb=compact_bytes / 1e6,
+        legacy_encode_ms=legacy_s * 1000,
+        compact_first_encode_ms=timings[0] * 1000,
+        compact_cached_encode_ms=sum(timings[1:]) * 1000,
+        decode_ms=decode_s * 1000,
+        encoded_mb=sum(len(s.to_json()) for _, s in compact_state.values()) / 1e6,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic load benchmarks for the Kabuten agent tree.")
+    parser.add_argument("--scenario", nargs="+", default=["sweep", "chat", "escalation", "encoding"],
+                        choices=["sweep", "chat", "escalation", "encoding"])
+    parser.add_argument("--scale", nargs="+", default=["live", "synthetic"], choices=list(SCALES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-scale", type=float, default=LatencyProfile.time_scale)
+    parser.add_argument("--rate-limit-rate", type=float, default=LatencyProfile.rate_limit_rate)
+    parser.add_argument("--chats-per-sector", type=int, default=3)
+    parser.add_argument("--profile", action="store_true", help="attribute loop stalls and sample CPU (LoopProfiler)")
+    parser.add_argument("--json", dest="json_path", default=None, help="write reports as JSON")
+    args = parser.parse_args()
+
+    profile = LatencyProfile(time_scale=args.time_scale, rate_limit_rate=args.rate_limit_rate)
+    reports = []
+    for scale in args.scale:
+        for scenario in args.scenario:
+            if scenario == "encoding":
+                report = run_encoding_benchmark(scale, args.seed)
+            else:
+                report = run_benchmark(scenario, scale, profile, args.seed, args.chats_per_sector, args.profile)
+            print(report.format())
+            reports.append(asdict(report))
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(reports, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Sector briefs — compact, precomputed sector views materialised after every sweep.
+
+Each time a sweep is applied to a sector thread, a SectorBrief is built from the
+synthesis: posture, conviction, drivers, risks, material findings and what
+changed since the previous brief. KabutenOrchestrator rolls the briefs up into a
+cross-sector Rollup. Both live in a BriefStore — one small versioned JSON
+artifact — so dashboard reads are dictionary lookups with no model calls.
+"""
+
+import json
+import os
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from agents.sector_agent import SectorSynthesis
+
+
+@dataclass
+class SectorBrief:
+    sector_key: str
+    designation: str
+    generated_at: str
+    run_id: str | None
+    posture: str
+    conviction: float
+    thesis_summary: str
+    key_drivers: list[str]
+    key_risks: list[str]
+    material_findings: list[dict]
+    signals: dict[str, str]  # ticker → signal, for change detection on the next run
+    changes: dict = field(default_factory=dict)
+
+
+@dataclass
+class Rollup:
+    generated_at: str
+    posture_counts: dict[str, int]
+    average_conviction: float
+    sectors: dict[str, dict]
+    posture_changes: list[dict]
+    material_findings: list[dict]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def build_sector_brief(
+    synthesis: "SectorSynthesis",
+    previous: SectorBrief | None = None,
+    run_id: str | None = None,
+) -> SectorBrief:
+    """Materialise a brief from a synthesis, diffing against the previous brief."""
+    signals = {f.ticker: f.signal for f in synthesis.company_signals}
+    if previous is not None:
+        # Selective sweeps cover a subset of names; keep the last known signal for the rest
+        signals = {**previous.signals, **signals}
+    material = [
+        {
+            "ticker": f.ticker,
+            "company_name": f.company_name,
+            "headline": f.headline,
+            "signal": f.signal,
+            "category": f.category,
+        }
+        for f in synthesis.material_findings
+    ]
+
+    changes: dict = {}
+    if previous is not None:
+        if previous.posture != synthesis.posture:
+            changes["posture"] = {"from": previous.posture, "to": synthesis.posture}
+        changes["conviction_delta"] = round(synthesis.conviction - previous.conviction, 2)
+        changes["signal_changes"] = [
+            {"ticker": t, "from": previous.signals[t], "to": s}
+            for t, s in signals.items()
+            if t in previous.signals and previous.signals[t] != s
+        ]
+        previously_material = {m["ticker"] for m in previous.material_findings}
+        changes["new_material"] = [m["ticker"] for m in material if m["ticker"] not in previously_material]
+
+    return SectorBrief(
+        sector_key=synthesis.sector_key,
+        designation=synthesis.designation,
+        generated_at=_now(),
+        run_id=run_id,
+        posture=synthesis.posture,
+        conviction=synthesis.conviction,
+        thesis_summary=synthesis.thesis_summary,
+        key_drivers=list(synthesis.key_drivers),
+        key_risks=list(synthesis.key_risks),
+        material_findings=material,
+        signals=signals,
+        changes=changes,
+    )
+
+
+def build_rollup(briefs: dict[str, SectorBrief]) -> Rollup:
+    """Cross-sector summary of the latest brief for every sector."""
+    convictions = [b.conviction for b in briefs.values()]
+    return Rollup(
+        generated_at=_now(),
+        posture_counts=dict(Counter(b.posture for b in briefs.values())),
+        average_conviction=round(sum(convictions) / len(convictions), 2) if convictions else 0.0,
+        sectors={
+            key: {
+                "designation": b.designation,
+                "posture": b.posture,
+                "conviction": b.conviction,
+                "material_count": len(b.material_findings),
+                "generated_at": b.generated_at,
+            }
+            for key, b in sorted(briefs.items())
+        },
+        posture_changes=[
+            {"sector_key": key, "designation": b.designation, **b.changes["posture"]}
+            for key, b in sorted(briefs.items())
+            if "posture" in b.changes
+        ],
+        material_findings=[
+            {"sector_key": key, "designation": b.designation, **m}
+            for key, b in sorted(briefs.items())
+            for m in b.material_findings
+        ],
+    )
+
+
+class BriefStore:
+    """Latest brief per sector plus the roll-up, persisted as one versioned JSON artifact."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.version = 0
+        self._briefs: dict[str, SectorBrief] = {}
+        self._rollup: Rollup | None = None
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                data = json.load(fh)
+            self.version = data.get("version", 0)
+            self._briefs = {k: SectorBrief(**v) for k, v in data.get("sectors", {}).items()}
+            if data.get("rollup"):
+                self._rollup = Rollup(**data["rollup"])
+
+    def get(self, sector_key: str) -> SectorBrief | None:
+        return self._briefs.get(sector_key)
+
+    def all(self) -> dict[str, SectorBrief]:
+        return dict(self._briefs)
+
+    def put(self, brief: SectorBrief) -> None:
+        self._briefs[brief.sector_key] = brief
+
+    def rollup(self) -> Rollup | None:
+        return self._rollup
+
+    def refresh_rollup(self) -> Rollup:
+        """Rebuild the roll-up from current briefs and publish a new artifact version."""
+        self._rollup = build_rollup(self._briefs)
+        self.save()
+        return self._rollup
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "sectors": {k: asdict(b) for k, b in self._briefs.items()},
+            "rollup": asdict(self._rollup) if self._rollup else None,
+        }
+
+    def save(self) -> None:
+        self.version += 1
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self.to_dict(), fh)
+        os.replace(tmp, self.path)
@@ -0,0 +1,253 @@
+"""
+TokenBudget — per-call token planning and per-run/per-sector spend accounting.
+
+Every model call asks its budget for a CallPlan before sending: the prompt is
+counted locally, the answer allowance is sized from the task type (and, for
+fixed-format JSON tasks, from the answers actually observed), and thinking is
+sized by task type. Plans reserve tokens against the run and sector caps; the
+response's usage is then recorded against them. As caps run low, plans degrade —
+thinking shrinks, then is disabled, then the answer allowance shrinks, never
+below MIN_ANSWER_SHARE of the task default — and once a call no longer fits,
+planning raises BudgetExceeded so the caller can skip or fall back.
+"""
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+
+# task → (answer tokens, thinking tokens) when unconstrained
+TASK_LIMITS: dict[str, tuple[int, int]] = {
+    "sweep": (1024, 1024),
+    "escalation": (2048, 4096),
+    "synthesis": (1024, 2048),
+    "chat": (4096, 4096),
+}
+MIN_THINKING = 1024  # API minimum for budget_tokens
+# Smallest answer allowance, as a share of the task default; below it answers truncate
+MIN_ANSWER_SHARE = 0.75
+# Tasks with fixed-format answers, whose allowance may shrink to fit observed answers.
+# Chat replies vary too much in length to size from history.
+HISTORY_SIZED_TASKS = ("sweep", "escalation", "synthesis")
+HISTORY_WINDOW = 20
+HISTORY_MIN_SAMPLES = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a call cannot fit within the remaining run or sector budget."""
+
+
+class AnswerTruncated(RuntimeError):
+    """Raised when a response stopped at max_tokens, so its answer is incomplete."""
+
+
+def truncated(response) -> bool:
+    return getattr(response, "stop_reason", None) == "max_tokens"
+
+
+@dataclass
+class CallPlan:
+    task: str
+    sector_key: str
+    prompt_tokens: int
+    answer_tokens: int
+    thinking_tokens: int  # 0 → thinking disabled
+    degraded: bool = False
+    overhead: int = 0  # learned server-side input overhead included in prompt_tokens
+
+    @property
+    def max_tokens(self) -> int:
+        return self.answer_tokens + self.thinking_tokens
+
+    @property
+    def thinking(self) -> dict:
+        if self.thinking_tokens:
+            return {"type": "enabled", "budget_tokens": self.thinking_tokens}
+        return {"type": "disabled"}
+
+    @property
+    def reserved(self) -> int:
+        return self.prompt_tokens + self.max_tokens
+
+
+@dataclass
+class _Ledger:
+    cap: int | None = None
+    spent: int = 0
+    reserved: int = 0
+    calls: int = 0
+    degraded: int = 0
+    refused: int = 0
+
+    def remaining(self) -> float:
+        return math.inf if self.cap is None else self.cap - self.spent - self.reserved
+
+
+@dataclass
+class _TaskHistory:
+    answers: deque = field(default_factory=lambda: deque(maxlen=HISTORY_WINDOW))
+    input_overhead: deque = field(default_factory=lambda: deque(maxlen=HISTORY_WINDOW))
+
+
+class TokenBudget:
+    """Token caps for one run (or for a long-lived process when uncapped)."""
+
+    def __init__(
+        self,
+        run_cap: int | None = None,
+        sector_cap: int | None = None,
+        sector_caps: dict[str, int] | None = None,
+    ):
+        self.sector_cap = sector_cap
+        self.sector_caps = sector_caps or {}
+        self._run = _Ledger(cap=run_cap)
+        self._sectors: dict[str, _Ledger] = {}
+        self._history: dict[str, _TaskHistory] = {}
+        self._lock = threading.Lock()
+
+    def for_sector(self, sector_key: str) -> "SectorBudget":
+        return SectorBudget(self, sector_key)
+
+    # ── Planning ──
+
+    def plan(self, task: str, sector_key: str, prompt: str) -> CallPlan:
+        """Size and reserve a call. Raises BudgetExceeded if it cannot fit."""
+        answer_default, thinking = TASK_LIMITS[task]
+        with self._lock:
+            history = self._history.setdefault(task, _TaskHistory())
+            # Server-side input additions (tool results, framing) observed on earlier calls
+            overhead = (
+                int(sum(history.input_overhead) / len(history.input_overhead))
+                if history.input_overhead else 0
+            )
+            prompt_tokens = estimate_tokens(prompt) + overhead
+
+            min_answer = int(answer_default * MIN_ANSWER_SHARE)
+            answer = answer_default
+            if task in HISTORY_SIZED_TASKS and len(history.answers) >= HISTORY_MIN_SAMPLES:
+                answer = min(answer_default, max(min_answer, math.ceil(max(history.answers) * 1.5)))
+
+            sector = self._sector(sector_key)
+            available = min(self._run.remaining(), sector.remaining()) - prompt_tokens
+            degraded = False
+            while thinking and answer + thinking > available:
+                degraded = True
+                thinking = thinking // 2 if thinking // 2 >= MIN_THINKING else 0
+            if answer > available:
+                degraded = True
+                answer = int(available)
+            if answer < min_answer:
+                self._run.refused += 1
+                sector.refused += 1
+                raise BudgetExceeded(
+                    f"{task} for '{sector_key}' needs ~{prompt_tokens + min_answer} tokens; "
+                    f"{max(0, int(available + prompt_tokens))} remaining"
+                )
+
+            plan = CallPlan(task, sector_key, prompt_tokens, answer, thinking, degraded, overhead)
+            for ledger in (self._run, sector):
+                ledger.reserved += plan.reserved
+                ledger.calls += 1
+                ledger.degraded += degraded
+            return plan
+
+    def record(self, plan: CallPlan, response=None, answer_text: str = "") -> None:
+        """Release a plan's reservation and charge actual usage (estimated if unavailable)."""
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", None)
+        output_tokens = getattr(usage, "output_tokens", None)
+        answer_tokens = estimate_tokens(answer_text) if answer_text else 0
+        with self._lock:
+            history = self._history.setdefault(plan.task, _TaskHistory())
+            if answer_tokens:
+                history.answers.append(answer_tokens)
+            if input_tokens is not None:
+                local_estimate = plan.prompt_tokens - plan.overhead
+                history.input_overhead.append(max(0, input_tokens - local_estimate))
+            spent = (input_tokens if input_tokens is not None else plan.prompt_tokens) + (
+                output_tokens if output_tokens is not None else answer_tokens + plan.thinking_tokens
+            )
+            for ledger in (self._run, self._sector(plan.sector_key)):
+                ledger.reserved -= plan.reserved
+                ledger.spent += spent
+
+    def release(self, plan: CallPlan) -> None:
+        """Drop a plan's reservation without charging it (the call failed before completing)."""
+        with self._lock:
+            for ledger in (self._run, self._sector(plan.sector_key)):
+                ledger.reserved -= plan.reserved
+
+    def abandon(self, plan: CallPlan) -> None:
+        """Charge a plan at its full reservation — the call was cancelled or timed out
+        and may still be spending tokens at the API, so its real usage is unknown."""
+        with self._lock:
+            for ledger in (self._run, self._sector(plan.sector_key)):
+                ledger.reserved -= plan.reserved
+                ledger.spent += plan.reserved
+
+    # ── Reporting ──
+
+    def report(self) -> dict:
+        """Spend against budget for the run and each sector."""
+        with self._lock:
+            def row(ledger: _Ledger) -> dict:
+                return {
+                    "cap": ledger.cap,
+                    "spent": ledger.spent,
+                    "calls": ledger.calls,
+                    "degraded": ledger.degraded,
+                    "refused": ledger.refused,
+                }
+            return {
+                "run": row(self._run),
+                "sectors": {k: row(v) for k, v in sorted(self._sectors.items())},
+            }
+
+    def format_report(self) -> str:
+        report = self.report()
+        run = report["run"]
+        cap = f"{run['cap']:,}" if run["cap"] is not None else "uncapped"
+        lines = [
+            f"Token spend: {run['spent']:,} / {cap} over {run['calls']} calls "
+            f"({run['degraded']} degraded, {run['refused']} refused)"
+        ]
+        for key, row in report["sectors"].items():
+            sector_cap = f"{row['cap']:,}" if row["cap"] is not None else "-"
+            lines.append(
+                f"  {key:<28} {row['spent']:>10,} / {sector_cap:>10}  "
+                f"calls {row['calls']:>4}  degraded {row['degraded']:>3}  refused {row['refused']:>3}"
+            )
+        return "\n".join(lines)
+
+    def _sector(self, sector_key: str) -> _Ledger:
+        ledger = self._sectors.get(sector_key)
+        if ledger is None:
+            ledger = _Ledger(cap=self.sector_caps.get(sector_key, self.sector_cap))
+            self._sectors[sector_key] = ledger
+        return ledger
+
+
+class SectorBudget:
+    """A TokenBudget bound to one sector — what company and sector agents receive."""
+
+    def __init__(self, budget: TokenBudget, sector_key: str):
+        self.budget = budget
+        self.sector_key = sector_key
+
+    def plan(self, task: str, prompt: str) -> CallPlan:
+        return self.budget.plan(task, self.sector_key, prompt)
+
+    def record(self, plan: CallPlan, response=None, answer_text: str = "") -> None:
+        self.budget.record(plan, response, answer_text)
+
+    def release(self, plan: CallPlan) -> None:
+        self.budget.release(plan)
+
+    def abandon(self, plan: CallPlan) -> None:
+        self.budget.abandon(plan)
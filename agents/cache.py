@@ -0,0 +1,91 @@
+"""
+ResponseCache — LRU cache of sector chat replies keyed on question + thread version.
+
+A reply is reusable only while the sector thread is unchanged: keys combine
+the sector, the normalised question and the thread version, and every sweep or
+new message bumps the version and drops that sector's entries. A fresh reply is
+itself a new message, so the cache serves back-to-back repeats — the same
+question asked again with no other exchange or sweep in between — and holds at
+most one live entry per sector; the entry-count and size bounds are a backstop
+across sectors. Hit/miss counts are kept for reporting.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class _Entry:
+    sector_key: str
+    reply: str
+    size: int
+
+
+class ResponseCache:
+    """Bounded LRU of chat replies shared across sector agents."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 4_000_000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(sector_key: str, question: str, version: int) -> str:
+        return hashlib.sha256(f"{sector_key}\0{version}\0{question}".encode()).hexdigest()
+
+    def get(self, sector_key: str, question: str, version: int) -> str | None:
+        k = self.key(sector_key, question, version)
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(k)
+            self.hits += 1
+            return entry.reply
+
+    def put(self, sector_key: str, question: str, version: int, reply: str) -> None:
+        size = len(reply.encode())
+        if size > self.max_bytes:
+            return
+        k = self.key(sector_key, question, version)
+        with self._lock:
+            old = self._entries.pop(k, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[k] = _Entry(sector_key, reply, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, sector_key: str) -> int:
+        """Drop every entry for a sector. Returns the number removed."""
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if e.sector_key == sector_key]
+            for k in stale:
+                self._bytes -= self._entries.pop(k).size
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,218 @@
+"""
+Cassettes — record and replay model traffic for the agent package.
+
+In record mode every `messages.create` call made through `make_client()` is
+forwarded to the real client and the request/response pair is written to a
+gzip-compressed JSON-lines cassette, keyed by a hash of the normalised request.
+Replay mode serves those responses back without touching the API, either at
+full speed or at the originally recorded latency.
+
+Requests are normalised before hashing: the date header is stripped, so a
+cassette recorded on one day replays on any other, and the token limits are
+left out, since TokenBudget sizes them from answers seen so far and that
+depends on the order in which concurrent calls complete, as is the per-request
+timeout a deadline-bound call carries.
+
+    python -m agents.cassette record day.jsonl.gz     # one live sweep, recorded
+    python -m agents.cassette replay day.jsonl.gz     # re-run it in seconds
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+import anthropic
+
+from agents.client import set_client_factory
+
+
+DATE_HEADER = re.compile(r"Today's date is [^\n]*\n\n")
+# Request fields sized adaptively per call — excluded from the replay key
+SIZING_FIELDS = ("max_tokens", "thinking")
+# Per-request transport options, not part of what the model is asked
+TRANSPORT_FIELDS = ("timeout",)
+
+
+class CassetteMiss(KeyError):
+    """Replay found no recorded response for a request."""
+
+
+def normalise_request(value: Any) -> Any:
+    """Strip per-day variation (the date header) from every string in a request."""
+    if isinstance(value, str):
+        return DATE_HEADER.sub("", value)
+    if isinstance(value, dict):
+        return {k: normalise_request(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalise_request(v) for v in value]
+    return value
+
+
+def request_key(request: dict) -> str:
+    content = {k: v for k, v in request.items() if k not in SIZING_FIELDS + TRANSPORT_FIELDS}
+    payload = json.dumps(normalise_request(content), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _to_plain(obj: Any) -> Any:
+    """SDK response (pydantic model or namespace) → JSON-compatible structure."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, SimpleNamespace):
+        return {k: _to_plain(v) for k, v in vars(obj).items()}
+    if isinstance(obj, dict):
+        return {k: _to_plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_plain(v) for v in obj]
+    return obj
+
+
+def _to_object(value: Any) -> Any:
+    """JSON structure → attribute-access objects shaped like SDK responses."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_object(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_object(v) for v in value]
+    return value
+
+
+class Cassette:
+    """Recorded interactions, grouped by request key in call order."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: dict[str, list[dict]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._cursor: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with gzip.open(path, "rt") as fh:
+                for line in fh:
+                    record = json.loads(line)
+                    self.interactions.setdefault(record["key"], []).append(record)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.interactions.values())
+
+    def add(self, key: str, request: dict, response: dict, elapsed: float) -> None:
+        with self._lock:
+            self.interactions.setdefault(key, []).append({
+                "key": key,
+                "request": normalise_request(request),
+                "response": response,
+                "elapsed": elapsed,
+            })
+
+    def next(self, key: str) -> dict:
+        """Next recorded interaction for `key`; repeats the last once exhausted."""
+        with self._lock:
+            records = self.interactions.get(key)
+            if not records:
+                self.misses += 1
+                raise CassetteMiss(key)
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            self.hits += 1
+            return records[min(i, len(records) - 1)]
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with gzip.open(tmp, "wt") as fh:
+            for records in self.interactions.values():
+                for record in records:
+                    fh.write(json.dumps(record) + "\n")
+        os.replace(tmp, self.path)
+
+
+class _CassetteMessages:
+    def __init__(self, client: "CassetteClient"):
+        self._client = client
+
+    def create(self, **request):
+        return self._client.create(request)
+
+
+class CassetteClient:
+    """Client wrapper that records to, or replays from, a Cassette."""
+
+    def __init__(self, cassette: Cassette, mode: str, inner: Any = None, timing: str = "fast"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.cassette = cassette
+        self.mode = mode
+        self.inner = inner
+        self.timing = timing
+        self.messages = _CassetteMessages(self)
+        self.beta = SimpleNamespace(messages=self.messages)
+
+    def create(self, request: dict):
+        key = request_key(request)
+        if self.mode == "replay":
+            record = self.cassette.next(key)
+            if self.timing == "recorded":
+                time.sleep(record["elapsed"])
+            return _to_object(record["response"])
+
+        start = time.perf_counter()
+        response = self.inner.messages.create(**request)
+        self.cassette.add(key, request, _to_plain(response), time.perf_counter() - start)
+        return response
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", timing: str = "fast") -> Iterator[Cassette]:
+    """Route every agent client created inside the block through a cassette.
+
+    In record mode the previously active client factory (the real Anthropic
+    client by default) serves the calls; the cassette is saved on exit.
+    """
+    cassette = Cassette(path)
+    previous = None
+
+    def factory() -> CassetteClient:
+        inner = None
+        if mode == "record":
+            inner = previous() if previous is not None else anthropic.Anthropic()
+        return CassetteClient(cassette, mode, inner=inner, timing=timing)
+
+    previous = set_client_factory(factory)
+    try:
+        yield cassette
+    finally:
+        set_client_factory(previous)
+        if mode == "record":
+            cassette.save()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record or replay a full daily sweep.")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("path", help="cassette file (.jsonl.gz)")
+    parser.add_argument("--timing", choices=["fast", "recorded"], default="fast")
+    args = parser.parse_args()
+
+    from agents.orchestrator import KabutenOrchestrator
+
+    with use_cassette(args.path, args.mode, args.timing) as cassette:
+        start = time.perf_counter()
+        syntheses = asyncio.run(KabutenOrchestrator().run_all_sweeps())
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{args.mode}: {len(syntheses)} sectors in {elapsed:.2f}s — "
+        f"{len(cassette)} interactions, {cassette.hits} hits, {cassette.misses} misses"
+    )
+
+
+if __name__ == "__main__":
+    main()
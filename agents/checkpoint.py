@@ -0,0 +1,123 @@
+"""
+RunManifest — per-run checkpoint log for resumable daily sweeps.
+
+Each company finding and each completed sector synthesis is appended to a
+JSON-lines manifest as soon as it arrives. Re-opening a manifest with the same
+run id replays it, so a resumed run only re-executes the units that are missing.
+A triggered run's selection (tickers scheduled per sector) is recorded when the
+run starts, so a resume sweeps the same companies.
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from agents import encoding
+from agents.company_agent import CompanyFinding
+
+if TYPE_CHECKING:
+    from agents.sector_agent import SectorSynthesis
+
+
+def default_run_id() -> str:
+    """Idempotent run id — one daily sweep per UTC date."""
+    return f"sweep-{datetime.now(timezone.utc).date().isoformat()}"
+
+
+class RunManifest:
+    """Append-only checkpoint log for one sweep run."""
+
+    def __init__(self, root: str, run_id: str | None = None):
+        self.root = root
+        self.run_id = run_id or default_run_id()
+        self.path = os.path.join(root, f"{self.run_id}.jsonl")
+        self.complete = False
+        self.scheduled: dict[str, list[str]] | None = None  # sector → tickers, for triggered runs
+        self._findings: dict[tuple[str, str, str], CompanyFinding] = {}
+        self._sectors: dict[str, dict] = {}
+        os.makedirs(root, exist_ok=True)
+        self._replay()
+
+    # ── Company units ──
+
+    def finding(self, sector_key: str, ticker: str, stage: str = "sweep") -> CompanyFinding | None:
+        """Checkpointed finding for a company, or None if it still needs to run."""
+        return self._findings.get((sector_key, ticker, stage))
+
+    def record_finding(self, sector_key: str, finding: CompanyFinding, stage: str = "sweep") -> None:
+        self._findings[(sector_key, finding.ticker, stage)] = finding
+        self._write(
+            {"unit": "company", "sector_key": sector_key, "stage": stage},
+            finding=finding.to_json(),
+        )
+
+    # ── Sector units ──
+
+    def sector(self, sector_key: str) -> dict | None:
+        """Checkpointed {"synthesis": ..., "sweep_entry": ...} for a completed sector.
+
+        The synthesis is the recorded SectorSynthesis, or its dict form when replayed.
+        """
+        return self._sectors.get(sector_key)
+
+    def record_sector(self, sector_key: str, synthesis: "SectorSynthesis", sweep_entry: dict) -> None:
+        self._sectors[sector_key] = {"synthesis": synthesis, "sweep_entry": sweep_entry}
+        self._write(
+            {"unit": "sector", "sector_key": sector_key, "sweep_entry": sweep_entry},
+            synthesis=synthesis.to_json(),
+        )
+
+    def record_selection(self, scheduled: dict[str, list[str]]) -> None:
+        """Record which tickers this run sweeps per sector (first record wins on replay)."""
+        if self.scheduled is not None:
+            return
+        self.scheduled = {k: list(v) for k, v in scheduled.items()}
+        self._write({"unit": "selection", "scheduled": self.scheduled})
+
+    def pending_sectors(self, sector_keys: list[str]) -> list[str]:
+        return [k for k in sector_keys if k not in self._sectors]
+
+    def mark_complete(self) -> None:
+        self.complete = True
+        self._write({"unit": "run", "status": "complete"})
+
+    # ── Internals ──
+
+    def _write(self, record: dict, **encoded: bytes) -> None:
+        """Append one record; `encoded` values are pre-encoded JSON spliced in as-is."""
+        record["at"] = datetime.now(timezone.utc).isoformat()
+        with open(self.path, "ab") as fh:
+            fh.write(encoding.splice(record, **encoded) + b"\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _replay(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as fh:
+            data = fh.read()
+        if data and not data.endswith(b"\n"):
+            # Drop a torn final line from a crash mid-write so new records start clean
+            data = data[: data.rfind(b"\n") + 1]
+            with open(self.path, "wb") as fh:
+                fh.write(data)
+        for line in data.splitlines():
+            try:
+                record = encoding.loads(line)
+            except ValueError:
+                continue
+            unit = record.get("unit")
+            if unit == "company":
+                finding = CompanyFinding.from_dict(record["finding"])
+                key = (record["sector_key"], finding.ticker, record.get("stage", "sweep"))
+                self._findings[key] = finding
+            elif unit == "sector":
+                self._sectors[record["sector_key"]] = {
+                    "synthesis": record["synthesis"],
+                    "sweep_entry": record["sweep_entry"],
+                }
+            elif unit == "selection" and self.scheduled is None:
+                self.scheduled = record["scheduled"]
+            elif unit == "run" and record.get("status") == "complete":
+                self.complete = True
+
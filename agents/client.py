@@ -0,0 +1,162 @@
+"""
+Model client factory — the single place agents obtain an Anthropic client.
+
+Agents call `make_client()` rather than constructing `anthropic.Anthropic()`
+directly, so benchmarks and tooling can substitute a client that exposes the
+same `messages.create` interface.
+
+The client is synchronous; `call_model` runs a call on a dedicated pool of
+daemon threads so sweeps overlap, an awaiting coroutine can be cancelled at a
+deadline, and a call abandoned that way never holds up interpreter exit.
+"""
+
+import asyncio
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import anthropic
+
+from agents.budget import CallPlan, SectorBudget
+
+
+# Model calls are network-bound: size the pool for a full sweep's fan-out, not for CPUs
+MODEL_CALL_WORKERS = 128
+
+_factory: Callable[[], Any] | None = None
+_executor: "_DaemonThreadPool | None" = None
+
+
+class DeadlineExceeded(TimeoutError):
+    """A model call was not sent because its deadline had already passed."""
+
+
+class _DaemonThreadPool(Executor):
+    """Minimal thread pool whose workers are daemon threads.
+
+    concurrent.futures.ThreadPoolExecutor joins its workers at interpreter exit,
+    so one abandoned call would keep the process alive until the call returns.
+    Workers are started by a spawner thread, never by the submitting (event-loop)
+    thread: Thread.start() waits for the new thread to boot, which stalls the
+    loop for a noticeable time when a sweep fans out.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._work: queue.SimpleQueue = queue.SimpleQueue()
+        self._idle = threading.Semaphore(0)
+        self._demand = threading.Semaphore(0)  # one release per submit no idle worker could take
+        self._threads = 0
+        threading.Thread(target=self._spawner, name=f"{thread_name_prefix}_spawner", daemon=True).start()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        self._work.put((future, functools.partial(fn, *args, **kwargs)))
+        if not self._idle.acquire(blocking=False):
+            self._demand.release()
+        return future
+
+    def _spawner(self) -> None:
+        while True:
+            self._demand.acquire()
+            if self._threads < self.max_workers:
+                self._threads += 1
+                threading.Thread(
+                    target=self._worker,
+                    name=f"{self.thread_name_prefix}_{self._threads}",
+                    daemon=True,
+                ).start()
+
+    def _worker(self) -> None:
+        while True:
+            future, fn = self._work.get()
+            # False when the awaiting task was cancelled before the call started
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn()
+                except BaseException as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+            self._idle.release()
+
+
+def make_client() -> Any:
+    """Return a new model client from the active factory (default: anthropic.Anthropic)."""
+    return _factory() if _factory is not None else anthropic.Anthropic()
+
+
+def set_client_factory(factory: Callable[[], Any] | None) -> Callable[[], Any] | None:
+    """Install a client factory (None restores the default). Returns the previous factory."""
+    global _factory
+    previous, _factory = _factory, factory
+    return previous
+
+
+@contextmanager
+def use_client_factory(factory: Callable[[], Any]) -> Iterator[None]:
+    """Temporarily route every new agent client through `factory`."""
+    previous = set_client_factory(factory)
+    try:
+        yield
+    finally:
+        set_client_factory(previous)
+
+
+async def call_model(
+    create: Callable[..., Any],
+    deadline: float | None = None,
+    budget: SectorBudget | None = None,
+    plan: CallPlan | None = None,
+    **kwargs,
+) -> Any:
+    """Await a blocking client call (e.g. `client.messages.create`) without blocking the loop.
+
+    With a `deadline` (time.monotonic()), the time remaining is sent as the
+    SDK's per-request `timeout` so the call itself ends by then (per attempt —
+    SDK retries each get the same allowance); a call that times out raises
+    TimeoutError, and one that would start after the deadline raises
+    DeadlineExceeded without being sent.
+
+    Cancelling the awaiting task abandons the call: a queued call never starts,
+    one already in flight runs until it returns or times out and its result is
+    discarded.
+
+    With `budget` and `plan`, a call that fails has its reservation settled
+    here: charged in full if it was abandoned in flight (cancelled or timed
+    out — it may still be spending tokens at the API), released otherwise.
+    A successful call is left for the caller to `record` with its answer.
+    """
+    try:
+        return await _send(create, deadline, kwargs)
+    except BaseException as exc:
+        if budget is not None and plan is not None:
+            in_flight = isinstance(exc, (asyncio.CancelledError, TimeoutError))
+            if in_flight and not isinstance(exc, DeadlineExceeded):
+                budget.abandon(plan)
+            else:
+                budget.release(plan)
+        raise
+
+
+async def _send(create: Callable[..., Any], deadline: float | None, kwargs: dict) -> Any:
+    global _executor
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("model call not started — deadline already passed")
+        kwargs["timeout"] = remaining
+    if _executor is None:
+        _executor = _DaemonThreadPool(MODEL_CALL_WORKERS, thread_name_prefix="model-call")
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_executor, functools.partial(create, **kwargs))
+    except anthropic.APITimeoutError as exc:
+        if deadline is None:
+            raise
+        raise TimeoutError(f"model call timed out after {kwargs['timeout']:.1f}s") from exc
@@ -6,11 +6,15 @@ Returns structured JSON findings with web search capability.
 Runs at effort="low" for routine sweeps, effort="high" for escalated deep-dives.
 """
 
-import anthropic
 import json
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from datetime import date
 
+from agents import encoding
+from agents.budget import AnswerTruncated, SectorBudget, TokenBudget, truncated
+from agents.client import call_model, make_client
+
 
 def date_header() -> str:
     """Dynamic date header — prepended to every system prompt at call time."""
@@ -25,8 +29,10 @@ def date_header() -> str:
     )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CompanyFinding:
+    """Immutable — shared by reference between the thread, synthesis, history and checkpoints."""
+
     ticker: str
     company_name: str
     finding_type: str  # "none" | "incremental" | "material"
@@ -36,7 +42,61 @@ class CompanyFinding:
     category: str  # "earnings" | "product" | "regulatory" | "competitive" | "macro"
     requires_escalation: bool
     assessment: str  # max 100 words
-    sources: list[str]
+    sources: tuple[str, ...] = ()
+    _json: bytes | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not isinstance(self.sources, tuple):
+            object.__setattr__(self, "sources", tuple(self.sources or ()))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CompanyFinding":
+        """Rebuild from `to_dict()` output (or a thread-entry `summary()`, which omits some fields)."""
+        return cls(
+            ticker=data.get("ticker", ""),
+            company_name=data.get("company_name", ""),
+            finding_type=data.get("finding_type", "none"),
+            headline=data.get("headline", ""),
+            detail=data.get("detail", ""),
+            signal=data.get("signal", "neutral"),
+            category=data.get("category", "macro"),
+            requires_escalation=bool(data.get("requires_escalation", False)),
+            assessment=data.get("assessment", ""),
+            sources=tuple(data.get("sources") or ()),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "ticker": self.ticker,
+            "company_name": self.company_name,
+            "finding_type": self.finding_type,
+            "headline": self.headline,
+            "detail": self.detail,
+            "signal": self.signal,
+            "category": self.category,
+            "requires_escalation": self.requires_escalation,
+            "assessment": self.assessment,
+            "sources": list(self.sources),
+        }
+
+    def summary(self) -> dict:
+        """The fields kept in persisted sector threads."""
+        return {
+            "ticker": self.ticker,
+            "company_name": self.company_name,
+            "finding_type": self.finding_type,
+            "headline": self.headline,
+            "detail": self.detail,
+            "signal": self.signal,
+            "category": self.category,
+            "assessment": self.assessment,
+        }
+
+    def to_json(self) -> bytes:
+        """`to_dict()` as JSON bytes — encoded on first use, then cached."""
+        if self._json is None:
+            object.__setattr__(self, "_json", encoding.dumps(self.to_dict()))
+        return self._json
 
 
 class CompanyCoverageAgent:
@@ -47,10 +107,23 @@ class CompanyCoverageAgent:
         self.exchange = exchange
         self.company_name = company_name
         self.sector_context = sector_context
-        self.client = anthropic.Anthropic()
+        self.client = make_client()
+
+    async def sweep(
+        self,
+        effort: str = "low",
+        budget: SectorBudget | None = None,
+        deadline: float | None = None,
+    ) -> CompanyFinding:
+        """Run a sweep for this company using web search.
 
-    async def sweep(self, effort: str = "low") -> CompanyFinding:
-        """Run a sweep for this company using web search."""
+        Token limits come from `budget` (sized by task and history); raises
+        BudgetExceeded if the sector or run budget cannot cover the call, and
+        AnswerTruncated if the answer hit max_tokens (rather than parsing a
+        partial answer into a default finding).
+        With a `deadline` (time.monotonic()) the call is cut off by the SDK
+        then and raises TimeoutError.
+        """
         system_prompt = (
             date_header()
             + f"You are a coverage analyst for {self.company_name} ({self.ticker} on {self.exchange}). "
@@ -69,21 +142,31 @@ class CompanyCoverageAgent:
             "Be rigorous. Most days there is nothing material. Only flag material when "
             "there is a genuine change to the investment thesis."
         )
+        user_content = (
+            f"Run today's sweep for {self.company_name} ({self.ticker}). "
+            f"Search for any news, filings, or developments from the past 24 hours."
+        )
 
         thinking_effort = {"low": "low", "medium": "medium", "high": "high"}.get(effort, "low")
+        budget = budget or TokenBudget().for_sector("")
+        plan = budget.plan(
+            "sweep" if thinking_effort == "low" else "escalation",
+            system_prompt + user_content,
+        )
 
-        response = self.client.messages.create(
+        # Off the event loop, so other sweeps proceed and a deadline can cancel the wait
+        response = await call_model(
+            self.client.messages.create,
+            deadline=deadline,
+            budget=budget,
+            plan=plan,
             model="claude-sonnet-4-6-20250929",
-            max_tokens=2048,
-            thinking={
-                "type": "enabled",
-                "budget_tokens": 1024 if thinking_effort == "low" else 4096,
-            },
+            max_tokens=plan.max_tokens,
+            thinking=plan.thinking,
             system=system_prompt,
             messages=[{
                 "role": "user",
-                "content": f"Run today's sweep for {self.company_name} ({self.ticker}). "
-                           f"Search for any news, filings, or developments from the past 24 hours.",
+                "content": user_content,
             }],
             tools=[{
                 "type": "web_search_20250305",
@@ -97,9 +180,11 @@ class CompanyCoverageAgent:
         for block in response.content:
             if hasattr(block, "text"):
                 text += block.text
+        budget.record(plan, response, text)
+        if truncated(response):
+            raise AnswerTruncated(f"sweep answer for {self.ticker} hit max_tokens ({plan.max_tokens})")
 
         try:
-            import re
             json_match = re.search(r"\{[\s\S]*\}", text)
             if json_match:
                 data = json.loads(json_match.group())
@@ -0,0 +1,36 @@
+"""
+Compact JSON encoding — orjson when installed, the stdlib json module otherwise.
+
+Findings and syntheses encode themselves once and cache the bytes; `splice`
+embeds such pre-encoded values in a larger record (checkpoint lines, queue
+results) without decoding and re-encoding them.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def splice(record: dict, **encoded: bytes) -> bytes:
+    """Encode `record` with extra keys whose values are already-encoded JSON."""
+    head = dumps(record)
+    if not encoded:
+        return head
+    parts = [b'"%s":%s' % (dumps(key)[1:-1], value) for key, value in encoded.items()]
+    separator = b"," if len(head) > 2 else b""
+    return head[:-1] + separator + b",".join(parts) + b"}"
@@ -0,0 +1,407 @@
+"""
+FindingsStore — append-only columnar history of company findings and sector syntheses.
+
+Every sweep appends one row per CompanyFinding and one row per SectorSynthesis.
+Rows are held column-by-column in typed arrays with dictionary-encoded strings,
+and persisted as one append-only binary file per column. Queries (streaks,
+signal changes, sector breadth) scan integer columns through per-ticker and
+per-sector row indexes instead of deserialising every sector thread.
+"""
+
+import json
+import os
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+from agents.company_agent import CompanyFinding
+
+
+# Column name → array typecode. Strings are stored as codes into the shared dictionary.
+FINDING_COLUMNS = {
+    "day": "i",           # date.toordinal()
+    "sector": "I",
+    "ticker": "I",
+    "signal": "I",
+    "category": "I",
+    "finding_type": "I",
+}
+SYNTHESIS_COLUMNS = {
+    "day": "i",
+    "sector": "I",
+    "posture": "I",
+    "conviction": "d",
+}
+
+
+@dataclass
+class Streak:
+    key: str  # ticker for findings, sector key for syntheses
+    value: str  # signal or posture held throughout the streak
+    start: date
+    end: date
+    observations: int
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+
+@dataclass
+class Change:
+    key: str
+    sector_key: str
+    on: date
+    previous: str
+    current: str
+
+
+class _Table:
+    """A set of equal-length typed columns with per-sector and per-ticker row indexes."""
+
+    def __init__(self, name: str, spec: dict[str, str]):
+        self.name = name
+        self.spec = spec
+        self.columns = {col: array(code) for col, code in spec.items()}
+        self.by_sector: dict[int, list[int]] = {}
+        self.by_ticker: dict[int, list[int]] = {}
+        self.persisted = 0
+
+    def __len__(self) -> int:
+        return len(self.columns["day"])
+
+    def append(self, row: dict) -> None:
+        n = len(self)
+        for col, values in self.columns.items():
+            values.append(row[col])
+        self._index(n)
+
+    def _index(self, row: int) -> None:
+        self.by_sector.setdefault(self.columns["sector"][row], []).append(row)
+        if "ticker" in self.columns:
+            self.by_ticker.setdefault(self.columns["ticker"][row], []).append(row)
+
+    def _path(self, root: str, col: str) -> str:
+        return os.path.join(root, f"{self.name}.{col}.bin")
+
+    def load(self, root: str) -> None:
+        sizes = {}
+        for col, code in self.spec.items():
+            path = self._path(root, col)
+            values = array(code)
+            sizes[col] = 0
+            if os.path.exists(path):
+                with open(path, "rb") as fh:
+                    data = fh.read()
+                sizes[col] = len(data)
+                values.frombytes(data[: len(data) - len(data) % values.itemsize])
+            self.columns[col] = values
+
+        # A crash between (or during) column writes leaves ragged files — keep only complete rows.
+        n = min(len(v) for v in self.columns.values())
+        for col, values in self.columns.items():
+            if len(values) != n or sizes[col] != n * values.itemsize:
+                del values[n:]
+                with open(self._path(root, col), "wb") as fh:
+                    values.tofile(fh)
+
+        for row in range(n):
+            self._index(row)
+        self.persisted = n
+
+    def flush(self, root: str) -> None:
+        if self.persisted == len(self):
+            return
+        for col, values in self.columns.items():
+            with open(self._path(root, col), "ab") as fh:
+                values[self.persisted:].tofile(fh)
+        self.persisted = len(self)
+
+
+class FindingsStore:
+    """Append-only columnar store of findings and syntheses with signal analytics."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._strings: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._persisted_strings = 0
+        self._findings = _Table("findings", FINDING_COLUMNS)
+        self._syntheses = _Table("syntheses", SYNTHESIS_COLUMNS)
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+
+    # ── Ingest ──
+
+    def record_sweep(
+        self,
+        sector_key: str,
+        findings: list[CompanyFinding],
+        posture: str,
+        conviction: float,
+        on: date | None = None,
+    ) -> None:
+        """Append one sweep's findings and synthesis, then persist. `on` defaults to today (UTC)."""
+        day = (on or datetime.now(timezone.utc).date()).toordinal()
+        sector = self._code(sector_key)
+        for f in findings:
+            self._findings.append({
+                "day": day,
+                "sector": sector,
+                "ticker": self._code(f.ticker),
+                "signal": self._code(f.signal),
+                "category": self._code(f.category),
+                "finding_type": self._code(f.finding_type),
+            })
+        self._syntheses.append({
+            "day": day,
+            "sector": sector,
+            "posture": self._code(posture),
+            "conviction": float(conviction),
+        })
+        self.flush()
+
+    def backfill_thread(self, sector_key: str, thread: list[dict]) -> int:
+        """Import sweep entries from a persisted thread. Returns number of sweeps imported.
+
+        Idempotent: a sweep is skipped if the store already has a synthesis for
+        that sector on that (UTC) day, whether recorded live or by an earlier backfill.
+        """
+        recorded = self._sweep_days(sector_key)
+        imported = 0
+        for entry in thread:
+            if entry.get("type") != "sweep":
+                continue
+            try:
+                stamp = datetime.fromisoformat(entry["timestamp"])
+            except (KeyError, ValueError):
+                continue
+            if stamp.tzinfo is not None:
+                stamp = stamp.astimezone(timezone.utc)
+            on = stamp.date()
+            if on.toordinal() in recorded:
+                continue
+            findings = [CompanyFinding.from_dict(d) for d in entry.get("findings", [])]
+            synthesis = entry.get("synthesis", {})
+            self.record_sweep(
+                sector_key,
+                findings,
+                posture=synthesis.get("posture", "neutral"),
+                conviction=float(synthesis.get("conviction", 5.0)),
+                on=on,
+            )
+            recorded.add(on.toordinal())
+            imported += 1
+        return imported
+
+    def flush(self) -> None:
+        """Persist rows appended since the last flush. No-op for in-memory stores."""
+        if not self.path:
+            return
+        if self._persisted_strings != len(self._strings):
+            tmp = os.path.join(self.path, "dictionary.json.tmp")
+            with open(tmp, "w") as fh:
+                json.dump(self._strings, fh)
+            os.replace(tmp, os.path.join(self.path, "dictionary.json"))
+            self._persisted_strings = len(self._strings)
+        self._findings.flush(self.path)
+        self._syntheses.flush(self.path)
+
+    # ── Queries ──
+
+    def __len__(self) -> int:
+        return len(self._findings)
+
+    def tickers(self) -> list[str]:
+        return [self._strings[c] for c in self._findings.by_ticker]
+
+    def sectors(self) -> list[str]:
+        return [self._strings[c] for c in self._syntheses.by_sector]
+
+    def ticker_history(self, ticker: str) -> list[tuple[date, str, str, str]]:
+        """(date, signal, category, finding_type) per sweep day for one ticker."""
+        cols = self._findings.columns
+        return [
+            (
+                date.fromordinal(day),
+                self._strings[cols["signal"][row]],
+                self._strings[cols["category"][row]],
+                self._strings[cols["finding_type"][row]],
+            )
+            for day, row in self._daily(self._findings, "by_ticker", ticker)
+        ]
+
+    def posture_history(self, sector_key: str) -> list[tuple[date, str, float]]:
+        """(date, posture, conviction) per sweep day for one sector."""
+        cols = self._syntheses.columns
+        return [
+            (date.fromordinal(day), self._strings[cols["posture"][row]], cols["conviction"][row])
+            for day, row in self._daily(self._syntheses, "by_sector", sector_key)
+        ]
+
+    def streak(self, ticker: str, as_of: date | None = None) -> Streak | None:
+        """Current run of consecutive sweeps in which `ticker` held the same signal."""
+        return self._streak(self._findings, "by_ticker", "signal", ticker, as_of)
+
+    def posture_streak(self, sector_key: str, as_of: date | None = None) -> Streak | None:
+        """Current run of consecutive syntheses in which a sector held the same posture."""
+        return self._streak(self._syntheses, "by_sector", "posture", sector_key, as_of)
+
+    def streaks(
+        self,
+        signal: str | None = None,
+        min_days: int = 1,
+        as_of: date | None = None,
+    ) -> list[Streak]:
+        """Current streaks for every ticker, longest first."""
+        result = []
+        for ticker in self.tickers():
+            s = self.streak(ticker, as_of)
+            if s and s.days >= min_days and (signal is None or s.value == signal):
+                result.append(s)
+        result.sort(key=lambda s: (-s.days, s.key))
+        return result
+
+    def signal_changes(
+        self,
+        since: date | None = None,
+        sector_key: str | None = None,
+    ) -> list[Change]:
+        """Every ticker whose signal changed between consecutive sweeps on or after `since`."""
+        if sector_key is not None:
+            code = self._codes.get(sector_key)
+            rows = self._findings.by_sector.get(code, []) if code is not None else []
+            tickers = {self._strings[self._findings.columns["ticker"][r]] for r in rows}
+        else:
+            tickers = self.tickers()
+        changes = []
+        for ticker in tickers:
+            changes.extend(self._changes(self._findings, "by_ticker", "signal", ticker, since))
+        changes.sort(key=lambda c: (c.on, c.key))
+        return changes
+
+    def posture_changes(self, since: date | None = None) -> list[Change]:
+        """Every sector whose synthesised posture flipped on or after `since`."""
+        changes = []
+        for sector_key in self.sectors():
+            changes.extend(self._changes(self._syntheses, "by_sector", "posture", sector_key, since))
+        changes.sort(key=lambda c: (c.on, c.key))
+        return changes
+
+    def sector_breadth(self, as_of: date | None = None) -> dict[str, dict[str, int]]:
+        """Latest signal per ticker, counted by sector: {sector: {signal: n}}."""
+        cols = self._findings.columns
+        breadth: dict[str, dict[str, int]] = {}
+        for ticker in self.tickers():
+            daily = self._daily(self._findings, "by_ticker", ticker, as_of)
+            if not daily:
+                continue
+            row = daily[-1][1]
+            sector = self._strings[cols["sector"][row]]
+            signal = self._strings[cols["signal"][row]]
+            breadth.setdefault(sector, Counter())[signal] += 1
+        return {k: dict(v) for k, v in breadth.items()}
+
+    # ── Internals ──
+
+    def _sweep_days(self, sector_key: str) -> set[int]:
+        """Days (ordinals) on which a synthesis is recorded for `sector_key`."""
+        code = self._codes.get(sector_key)
+        if code is None:
+            return set()
+        days = self._syntheses.columns["day"]
+        return {days[row] for row in self._syntheses.by_sector.get(code, [])}
+
+    def _code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(value)
+            self._codes[value] = code
+        return code
+
+    def _daily(
+        self,
+        table: _Table,
+        index: str,
+        key: str,
+        as_of: date | None = None,
+    ) -> list[tuple[int, int]]:
+        """(day, row) pairs for `key`, one per day (latest row wins), in date order."""
+        code = self._codes.get(key)
+        if code is None:
+            return []
+        days = table.columns["day"]
+        limit = as_of.toordinal() if as_of else None
+        per_day: dict[int, int] = {}
+        for row in getattr(table, index).get(code, []):
+            day = days[row]
+            if limit is None or day <= limit:
+                per_day[day] = row
+        return sorted(per_day.items())
+
+    def _streak(
+        self,
+        table: _Table,
+        index: str,
+        column: str,
+        key: str,
+        as_of: date | None,
+    ) -> Streak | None:
+        daily = self._daily(table, index, key, as_of)
+        if not daily:
+            return None
+        values = table.columns[column]
+        current = values[daily[-1][1]]
+        start = daily[-1][0]
+        observations = 0
+        for day, row in reversed(daily):
+            if values[row] != current:
+                break
+            start = day
+            observations += 1
+        return Streak(
+            key=key,
+            value=self._strings[current],
+            start=date.fromordinal(start),
+            end=date.fromordinal(daily[-1][0]),
+            observations=observations,
+        )
+
+    def _changes(
+        self,
+        table: _Table,
+        index: str,
+        column: str,
+        key: str,
+        since: date | None,
+    ) -> list[Change]:
+        values = table.columns[column]
+        sectors = table.columns["sector"]
+        limit = since.toordinal() if since else None
+        changes = []
+        previous = None
+        for day, row in self._daily(table, index, key):
+            value = values[row]
+            if previous is not None and value != previous and (limit is None or day >= limit):
+                changes.append(Change(
+                    key=key,
+                    sector_key=self._strings[sectors[row]],
+                    on=date.fromordinal(day),
+                    previous=self._strings[previous],
+                    current=self._strings[value],
+                ))
+            previous = value
+        return changes
+
+    def _load(self) -> None:
+        dictionary = os.path.join(self.path, "dictionary.json")
+        if os.path.exists(dictionary):
+            with open(dictionary) as fh:
+                self._strings = json.load(fh)
+            self._codes = {s: i for i, s in enumerate(self._strings)}
+            self._persisted_strings = len(self._strings)
+        self._findings.load(self.path)
+        self._syntheses.load(self.path)
@@ -6,17 +6,55 @@ Routes OC chat messages to the correct sector thread.
 """
 
 import asyncio
+from typing import TYPE_CHECKING
+
+from agents.brief import BriefStore, Rollup, SectorBrief
+from agents.budget import TokenBudget
+from agents.cache import ResponseCache
+from agents.checkpoint import RunManifest, default_run_id
+from agents.company_agent import CompanyFinding
 from agents.config import SECTORS, SectorDef
+from agents.history import FindingsStore
+from agents.profiling import LoopProfiler, ProfileReport, profiling_enabled
 from agents.sector_agent import SectorLeadAgent, SectorSynthesis
+from agents.work_queue import WorkQueue
+
+if TYPE_CHECKING:
+    from agents.triggers import SweepSelection
+
+
+# Time kept back from a run's time limit for briefs, checkpoints and reporting
+FINALISE_MARGIN_SECONDS = 5.0
 
 
 class KabutenOrchestrator:
     """Top-level orchestrator managing all 17 sector lead agents."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        history: FindingsStore | None = None,
+        sectors: dict[str, SectorDef] | None = None,
+        briefs: BriefStore | None = None,
+        profile: bool | None = None,
+        run_cap: int | None = None,
+        sector_cap: int | None = None,
+    ):
+        self.history = history
+        # Caps for the per-run budget used when a sweep is not given one
+        self.run_cap = run_cap
+        self.sector_cap = sector_cap
+        # Opt-in loop-blocking/CPU profiling of sweeps (default: KABUTEN_PROFILE env var)
+        self.profile = profiling_enabled() if profile is None else profile
+        self.last_profile_report: ProfileReport | None = None
+        self.briefs = briefs or BriefStore()
+        self.budget = TokenBudget()
+        self.last_budget_report: dict | None = None
+        self.cache = ResponseCache()
         self._agents: dict[str, SectorLeadAgent] = {}
-        for key, sector in SECTORS.items():
-            self._agents[key] = SectorLeadAgent(sector)
+        for key, sector in (sectors or SECTORS).items():
+            self._agents[key] = SectorLeadAgent(
+                sector, history=history, budget=self.budget, cache=self.cache, briefs=self.briefs,
+            )
 
     def load_all_threads(self, threads: dict[str, list[dict]]) -> None:
         """Load persisted thread histories for all agents."""
@@ -24,34 +62,199 @@ class KabutenOrchestrator:
             if key in self._agents:
                 self._agents[key].load_thread_history(history)
 
+    def backfill_history(self, threads: dict[str, list[dict]]) -> int:
+        """Seed the findings store from persisted threads. Returns sweeps imported."""
+        if self.history is None:
+            return 0
+        return sum(
+            self.history.backfill_thread(key, history)
+            for key, history in threads.items()
+            if key in self._agents
+        )
+
     def export_thread(self, sector_key: str) -> list[dict]:
         """Export a sector's thread history for persistence."""
         agent = self._agents.get(sector_key)
         return agent.export_thread() if agent else []
 
-    async def run_all_sweeps(self) -> dict[str, SectorSynthesis]:
-        """Run daily sweep across all 17 sectors concurrently."""
+    async def run_all_sweeps(
+        self,
+        manifest: RunManifest | None = None,
+        budget: TokenBudget | None = None,
+        time_limit: float | None = None,
+        selection: "SweepSelection | None" = None,
+    ) -> dict[str, SectorSynthesis]:
+        """Run daily sweep across all 17 sectors concurrently.
+
+        Pass a RunManifest to checkpoint results as they arrive; re-running with the
+        same manifest (see `resume`) only executes the units that are missing.
+        Spend is tracked against `budget` (default: a fresh per-run TokenBudget with
+        the orchestrator's run and sector caps); it is printed and kept in
+        `last_budget_report` afterwards.
+        Pass `time_limit` (seconds) to finish within an execution limit: each sector
+        gets that budget less a finalisation margin, and sectors that run out of time
+        synthesise whatever findings arrived, flagged partial.
+        Pass a SweepSelection (from agents.triggers.TriggerEngine) to sweep only the
+        triggered and rotation-due companies; sectors with none scheduled are skipped.
+        With a manifest the selection is checkpointed too, and a resumed run sweeps
+        the recorded selection (a different one passed on resume is ignored).
+        With profiling enabled, a loop-blocking and CPU report for the run is printed
+        and kept in `last_profile_report`.
+        """
+        budget = budget or self.run_budget()
+        scheduled = selection.scheduled if selection is not None else None
+        if manifest is not None:
+            if manifest.scheduled is not None:
+                if scheduled is not None and scheduled != manifest.scheduled:
+                    print(f"{manifest.run_id}: resuming with the run's recorded selection")
+                scheduled = manifest.scheduled
+            elif scheduled is not None:
+                manifest.record_selection(scheduled)
+        agents = {
+            key: agent for key, agent in self._agents.items()
+            if scheduled is None or key in scheduled
+        }
+        sector_limit = None
+        if time_limit is not None:
+            sector_limit = max(0.0, time_limit - min(FINALISE_MARGIN_SECONDS, time_limit * 0.1))
+        profiler = LoopProfiler("sweep") if self.profile else None
+        if profiler is not None:
+            await profiler.start()
         results = await asyncio.gather(
-            *[agent.run_daily_sweep() for agent in self._agents.values()],
+            *[
+                agent.run_daily_sweep(
+                    manifest, budget, sector_limit,
+                    tickers=set(scheduled[key]) if scheduled is not None else None,
+                )
+                for key, agent in agents.items()
+            ],
             return_exceptions=True,
         )
+        if profiler is not None:
+            self.last_profile_report = await profiler.stop()
+            print(self.last_profile_report.format())
 
         syntheses: dict[str, SectorSynthesis] = {}
-        for key, result in zip(self._agents.keys(), results):
+        for key, result in zip(agents.keys(), results):
             if isinstance(result, Exception):
                 # Log error but continue
                 print(f"Error sweeping {key}: {result}")
                 continue
             syntheses[key] = result
+            if result.partial:
+                print(f"{key}: partial sweep — no finding for {', '.join(result.missing_tickers)}")
+
+        if manifest is not None and not manifest.pending_sectors(list(agents)):
+            manifest.mark_complete()
+
+        self.briefs.refresh_rollup()
+
+        self._report_budget(budget)
+
+        return syntheses
+
+    async def resume(
+        self,
+        checkpoint_dir: str,
+        run_id: str | None = None,
+        budget: TokenBudget | None = None,
+        time_limit: float | None = None,
+    ) -> dict[str, SectorSynthesis]:
+        """Resume (or start) the checkpointed run `run_id` — defaults to today's run.
 
+        A triggered run resumes with its recorded selection. Spend already
+        checkpointed is not re-counted: `budget` covers this invocation.
+        """
+        manifest = RunManifest(checkpoint_dir, run_id)
+        return await self.run_all_sweeps(manifest, budget, time_limit)
+
+    def run_budget(self) -> TokenBudget:
+        """A fresh TokenBudget for one run, with the orchestrator's caps."""
+        return TokenBudget(run_cap=self.run_cap, sector_cap=self.sector_cap)
+
+    def _report_budget(self, budget: TokenBudget) -> None:
+        self.last_budget_report = budget.report()
+        print(budget.format_report())
+
+    def enqueue_sweep(
+        self,
+        queue: WorkQueue,
+        run_id: str | None = None,
+        selection: "SweepSelection | None" = None,
+    ) -> str:
+        """Enqueue a sweep run as company work units for queue workers. Returns the run id."""
+        run_id = run_id or default_run_id()
+        for key, agent in self._agents.items():
+            companies = [
+                c for c in agent.sector.companies
+                if selection is None or c.ticker in selection.tickers(key)
+            ]
+            if selection is not None and not companies:
+                continue
+            if not companies:
+                queue.enqueue(run_id, "sector", key)
+            for company in companies:
+                queue.enqueue(run_id, "company", key, company.ticker)
+        return run_id
+
+    def collect(self, queue: WorkQueue, run_id: str) -> dict[str, SectorSynthesis]:
+        """Apply a queued run's completed sectors to threads and the findings store.
+
+        Dead-lettered units are reported. A sector whose synthesis unit was
+        dead-lettered still gets its company findings applied, under a local roll-up.
+        """
+        syntheses: dict[str, SectorSynthesis] = {}
+        for (key, _), result in queue.results(run_id, "sector").items():
+            agent = self._agents.get(key)
+            if not agent:
+                continue
+            synthesis = SectorSynthesis.from_dict(result["synthesis"])
+            # The synthesis carries the sector's findings; no need to re-read company units
+            agent.apply_sweep(list(synthesis.company_signals), synthesis, result["sweep_entry"])
+            syntheses[key] = synthesis
+
+        dead = queue.dead_letters(run_id)
+        for unit in dead:
+            print(f"{run_id}: dead-lettered {unit.kind} unit {unit.sector_key}/{unit.ticker} "
+                  f"after {unit.attempts} attempts")
+        for unit in dead:
+            agent = self._agents.get(unit.sector_key)
+            if unit.kind != "sector" or not agent or unit.sector_key in syntheses:
+                continue
+            results = queue.results(run_id, "company", unit.sector_key)
+            findings = [CompanyFinding.from_dict(r) for r in results.values()]
+            missing = [u.ticker for u in dead if u.kind == "company" and u.sector_key == unit.sector_key]
+            synthesis, sweep_entry = agent.rollup_sweep(findings, run_id, missing, reason="Synthesis unit failed")
+            agent.apply_sweep(findings, synthesis, sweep_entry)
+            syntheses[unit.sector_key] = synthesis
+
+        if syntheses:
+            self.briefs.refresh_rollup()
         return syntheses
 
-    async def run_sector_sweep(self, sector_key: str) -> SectorSynthesis | None:
-        """Run sweep for a single sector."""
+    async def run_sector_sweep(
+        self,
+        sector_key: str,
+        time_limit: float | None = None,
+        budget: TokenBudget | None = None,
+    ) -> SectorSynthesis | None:
+        """Run sweep for a single sector (spend reported as for `run_all_sweeps`)."""
         agent = self._agents.get(sector_key)
         if not agent:
             return None
-        return await agent.run_daily_sweep()
+        budget = budget or self.run_budget()
+        synthesis = await agent.run_daily_sweep(budget=budget, time_limit=time_limit)
+        self.briefs.refresh_rollup()
+        self._report_budget(budget)
+        return synthesis
+
+    def get_brief(self, sector_key: str) -> SectorBrief | None:
+        """Latest materialised brief for a sector — no model call."""
+        return self.briefs.get(sector_key)
+
+    def get_rollup(self) -> Rollup | None:
+        """Latest cross-sector roll-up — no model call."""
+        return self.briefs.rollup()
 
     async def chat(self, sector_key: str, message: str) -> str:
         """Route OC chat message to the correct sector agent."""
@@ -69,6 +272,10 @@ class KabutenOrchestrator:
                 f"Chat failed for sector '{sector_key}' ({agent.sector.designation}): {exc}"
             ) from exc
 
+    def cache_stats(self) -> dict:
+        """Chat response cache hit rate and occupancy."""
+        return self.cache.stats()
+
     def get_agent(self, sector_key: str) -> SectorLeadAgent | None:
         """Get a sector lead agent by key."""
         return self._agents.get(sector_key)
@@ -0,0 +1,290 @@
+"""
+LoopProfiler — opt-in event-loop blocking detector and sampling CPU profiler.
+
+A heartbeat coroutine measures event-loop lag while a watchdog thread samples
+the loop thread's stack (sys._current_frames). Whenever the heartbeat is late
+by more than `threshold`, the samples taken during the stall are attributed to
+the coroutine that was running and to the innermost call site in the agents
+package (plus the leaf frame it was stuck in). The same samples, taken whether
+or not the loop is stalled, form a CPU profile of everything run on the loop.
+
+Enable for sweeps with KabutenOrchestrator(profile=True) or KABUTEN_PROFILE=1,
+or wrap any workload:
+
+    async with LoopProfiler() as profiler:
+        await orchestrator.run_all_sweeps()
+    print(profiler.report.format())
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Leaf frames that mean the loop thread is idle, waiting for I/O or timers
+IDLE_LEAVES = {("selectors.py", "select"), ("selectors.py", "poll"), ("selectors.py", "_select")}
+
+Frame = tuple[str, int, str]  # (filename, lineno, function)
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get("KABUTEN_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+def _describe(frame: Frame) -> str:
+    filename, lineno, name = frame
+    if filename.startswith(PACKAGE_DIR):
+        filename = "agents/" + os.path.relpath(filename, PACKAGE_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{name} ({filename}:{lineno})"
+
+
+@dataclass
+class Stall:
+    started: float  # seconds since profiling began
+    duration: float
+    coroutine: str
+    site: str
+    leaf: str
+    samples: int
+
+
+@dataclass
+class ProfileReport:
+    label: str
+    wall_s: float
+    threshold_ms: float
+    lags: list[float]
+    stalls: list[Stall]
+    cpu_self: Counter = field(default_factory=Counter)  # function → samples where it was the leaf
+    cpu_total: Counter = field(default_factory=Counter)  # function → samples where it was on the stack
+    samples: int = 0
+    busy_samples: int = 0
+
+    @property
+    def blocked_s(self) -> float:
+        return sum(s.duration for s in self.stalls)
+
+    def lag_ms(self, pct: float) -> float:
+        if not self.lags:
+            return 0.0
+        ordered = sorted(self.lags)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] * 1000
+
+    def worst_offenders(self, n: int = 10) -> list[dict]:
+        """Blocking call sites ranked by total time the loop was stalled there."""
+        grouped: dict[tuple[str, str], dict] = {}
+        for stall in self.stalls:
+            row = grouped.setdefault(
+                (stall.coroutine, stall.site),
+                {"coroutine": stall.coroutine, "site": stall.site, "leaf": stall.leaf,
+                 "count": 0, "total_s": 0.0, "max_s": 0.0},
+            )
+            row["count"] += 1
+            row["total_s"] += stall.duration
+            row["max_s"] = max(row["max_s"], stall.duration)
+        return sorted(grouped.values(), key=lambda r: -r["total_s"])[:n]
+
+    def hot_functions(self, n: int = 10) -> list[dict]:
+        """Functions with the most loop-thread CPU samples (self time first)."""
+        busy = self.busy_samples or 1
+        return [
+            {"function": fn, "self_pct": 100 * count / busy, "total_pct": 100 * self.cpu_total[fn] / busy}
+            for fn, count in self.cpu_self.most_common(n)
+        ]
+
+    def to_dict(self, n: int = 10) -> dict:
+        return {
+            "label": self.label,
+            "wall_s": self.wall_s,
+            "lag_p50_ms": self.lag_ms(50),
+            "lag_p99_ms": self.lag_ms(99),
+            "lag_max_ms": max(self.lags, default=0.0) * 1000,
+            "stalls": len(self.stalls),
+            "blocked_s": self.blocked_s,
+            "worst_offenders": self.worst_offenders(n),
+            "hot_functions": self.hot_functions(n),
+            "busy_pct": 100 * self.busy_samples / self.samples if self.samples else 0.0,
+        }
+
+    def format(self, n: int = 10) -> str:
+        lines = [
+            f"Loop profile{f' — {self.label}' if self.label else ''}: {self.wall_s:.2f}s wall, "
+            f"lag p50 {self.lag_ms(50):.1f} ms / p99 {self.lag_ms(99):.1f} ms / "
+            f"max {max(self.lags, default=0.0) * 1000:.1f} ms, "
+            f"{len(self.stalls)} stalls ≥ {self.threshold_ms:.0f} ms ({self.blocked_s:.2f}s blocked)"
+        ]
+        offenders = self.worst_offenders(n)
+        if offenders:
+            lines.append("  Worst blocking call sites:")
+            lines.append(f"  {'total':>8} {'max':>8} {'count':>5}  coroutine → site [leaf]")
+            for row in offenders:
+                lines.append(
+                    f"  {row['total_s']:>7.3f}s {row['max_s']:>7.3f}s {row['count']:>5}  "
+                    f"{row['coroutine']} → {row['site']} [{row['leaf']}]"
+                )
+        if self.busy_samples:
+            busy_pct = 100 * self.busy_samples / self.samples
+            lines.append(f"  Loop-thread CPU: {self.busy_samples} of {self.samples} samples busy ({busy_pct:.0f}%)")
+            lines.append(f"  {'self%':>6} {'total%':>7}  function")
+            for row in self.hot_functions(n):
+                lines.append(f"  {row['self_pct']:>6.1f} {row['total_pct']:>7.1f}  {row['function']}")
+        return "\n".join(lines)
+
+
+class LoopProfiler:
+    """Watchdog-thread sampler for the running event loop."""
+
+    def __init__(
+        self,
+        label: str = "",
+        threshold: float = 0.05,
+        sample_interval: float = 0.005,
+        heartbeat: float = 0.01,
+        max_depth: int = 64,
+    ):
+        self.label = label
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.heartbeat = heartbeat
+        self.max_depth = max_depth
+        self.report: ProfileReport | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._task: asyncio.Task | None = None
+        self._loop_thread: int | None = None
+        self._started = 0.0
+        self._beat = 0.0
+        self._lags: list[float] = []
+        self._stalls: list[Stall] = []
+        self._open: Counter | None = None  # (coroutine, site, leaf) → samples for the stall in progress
+        self._cpu_self: Counter = Counter()
+        self._cpu_total: Counter = Counter()
+        self._samples = 0
+        self._busy = 0
+
+    async def __aenter__(self) -> "LoopProfiler":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._started = self._beat = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-profiler", daemon=True)
+        self._thread.start()
+        # Let the heartbeat reach its first sleep before the workload starts blocking
+        await asyncio.sleep(0)
+
+    async def stop(self) -> ProfileReport:
+        # A stall still in progress when the workload finishes is closed here
+        self._close_stall(time.perf_counter())
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.report = ProfileReport(
+            label=self.label,
+            wall_s=time.perf_counter() - self._started,
+            threshold_ms=self.threshold * 1000,
+            lags=self._lags,
+            stalls=self._stalls,
+            cpu_self=self._cpu_self,
+            cpu_total=self._cpu_total,
+            samples=self._samples,
+            busy_samples=self._busy,
+        )
+        return self.report
+
+    # ── Loop side ──
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self._close_stall(time.perf_counter())
+
+    def _close_stall(self, now: float) -> None:
+        with self._lock:
+            lag = max(0.0, now - self._beat - self.heartbeat)
+            self._beat = now
+            samples, self._open = self._open, None
+        self._lags.append(lag)
+        if lag < self.threshold:
+            return
+        samples = samples or Counter({("<unsampled>", "<unsampled>", "<unsampled>"): 0})
+        (coroutine, site, leaf), _ = samples.most_common(1)[0]
+        self._stalls.append(Stall(
+            started=now - lag - self._started,
+            duration=lag,
+            coroutine=coroutine,
+            site=site,
+            leaf=leaf,
+            samples=sum(samples.values()),
+        ))
+
+    # ── Watchdog side ──
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = self._stack(frame)
+            now = time.perf_counter()
+            self._sample_cpu(stack)
+            with self._lock:
+                if now - self._beat - self.heartbeat < self.threshold:
+                    continue
+                if self._open is None:
+                    self._open = Counter()
+                self._open[self._attribute(stack)] += 1
+
+    def _stack(self, frame) -> list[tuple[Frame, bool]]:
+        """Innermost-first (frame, is_coroutine) pairs for the sampled thread."""
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            name = getattr(code, "co_qualname", code.co_name)
+            stack.append(((code.co_filename, frame.f_lineno, name), bool(code.co_flags & inspect.CO_COROUTINE)))
+            frame = frame.f_back
+        return stack
+
+    def _sample_cpu(self, stack: list[tuple[Frame, bool]]) -> None:
+        self._samples += 1
+        leaf = stack[0][0]
+        if (os.path.basename(leaf[0]), leaf[2].rsplit(".", 1)[-1]) in IDLE_LEAVES:
+            return
+        self._busy += 1
+        self._cpu_self[_describe(leaf)] += 1
+        for fn in {_describe(f) for f, _ in stack}:
+            self._cpu_total[fn] += 1
+
+    @staticmethod
+    def _attribute(stack: list[tuple[Frame, bool]]) -> tuple[str, str, str]:
+        """(running coroutine, innermost agents-package call site, leaf frame)."""
+        depth = next((i for i, (_, is_coro) in enumerate(stack) if is_coro), None)
+        leaf = _describe(stack[0][0])
+        if depth is None:
+            # Loop machinery (callbacks, task scheduling) rather than any coroutine body
+            return "<event loop>", leaf, leaf
+        site = next(
+            (f for f, _ in stack[:depth + 1] if f[0].startswith(PACKAGE_DIR) and not f[0].endswith("profiling.py")),
+            stack[depth][0],
+        )
+        return stack[depth][0][2], _describe(site), leaf
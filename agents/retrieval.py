@@ -0,0 +1,131 @@
+"""
+ThreadIndex — incremental lexical retrieval over a sector thread.
+
+Every thread entry (OC messages, agent replies, sweep findings and syntheses)
+is split into short snippets and added to an in-memory BM25 index as it is
+appended. Chat prompts then carry the top-k snippets relevant to OC's question
+instead of a fixed window of recent entries, so prompt size stays flat however
+long the thread grows.
+"""
+
+import math
+import re
+
+from agents.budget import estimate_tokens
+
+
+STOPWORDS = frozenset(
+    "a an and are as at be by do does for from has have how i in is it its of on or "
+    "our so that the their there this to was we what when where which who why will "
+    "with you your oc".split()
+)
+TOKEN = re.compile(r"[a-z0-9][a-z0-9.&\-]*")
+SNIPPET_CHARS = 600
+
+
+def tokenize(text: str) -> list[str]:
+    return [t.rstrip(".-") for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def entry_snippets(entry: dict, designation: str = "Agent") -> list[str]:
+    """Render a thread entry as one or more self-contained snippets."""
+    day = (entry.get("timestamp") or "")[:10]
+    kind = entry.get("type")
+    if kind in ("oc_message", "pm_message"):
+        return [f"[{day}] OC: {entry.get('content', '')}"[:SNIPPET_CHARS]]
+    if kind == "agent_response":
+        return [f"[{day}] {designation}: {entry.get('content', '')}"[:SNIPPET_CHARS]]
+    if kind == "sweep":
+        snippets = [
+            (
+                f"[{day}] Sweep — {f.get('company_name', '')} ({f.get('ticker', '')}): "
+                f"[{f.get('finding_type', '')}/{f.get('signal', '')}/{f.get('category', '')}] "
+                f"{f.get('headline', '')}. {f.get('detail', '')} {f.get('assessment', '')}"
+            )[:SNIPPET_CHARS]
+            for f in entry.get("findings", [])
+            if f.get("finding_type") != "none"
+        ]
+        synthesis = entry.get("synthesis") or {}
+        if synthesis:
+            snippets.append((
+                f"[{day}] Sector synthesis: posture {synthesis.get('posture', '')}, "
+                f"conviction {synthesis.get('conviction', '')}. {synthesis.get('thesis_summary', '')}"
+            )[:SNIPPET_CHARS])
+        return snippets
+    return []
+
+
+class ThreadIndex:
+    """Append-only BM25 index of thread snippets."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.snippets: list[str] = []
+        self.entry_of: list[int] = []  # snippet id → thread entry index
+        self._lengths: list[int] = []
+        self._total_length = 0
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.snippets)
+
+    def add(self, entry_index: int, text: str) -> None:
+        doc = len(self.snippets)
+        terms = tokenize(text)
+        counts: dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            self._postings.setdefault(term, []).append((doc, tf))
+        self.snippets.append(text)
+        self.entry_of.append(entry_index)
+        self._lengths.append(len(terms))
+        self._total_length += len(terms)
+
+    def add_entry(self, entry_index: int, entry: dict, designation: str = "Agent") -> None:
+        for snippet in entry_snippets(entry, designation):
+            self.add(entry_index, snippet)
+
+    def search(
+        self,
+        query: str,
+        k: int = 12,
+        exclude_entries: set[int] | None = None,
+    ) -> list[tuple[int, float]]:
+        """Top-k (snippet id, score) pairs, newest first among equal scores."""
+        n = len(self.snippets)
+        if not n:
+            return []
+        avg_len = self._total_length / n or 1.0
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings:
+                norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * self._lengths[doc] / avg_len))
+                scores[doc] = scores.get(doc, 0.0) + idf * norm
+        if exclude_entries:
+            scores = {d: s for d, s in scores.items() if self.entry_of[d] not in exclude_entries}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return ranked[:k]
+
+    def context(
+        self,
+        query: str,
+        token_budget: int,
+        k: int = 12,
+        exclude_entries: set[int] | None = None,
+    ) -> list[str]:
+        """Relevant snippets for `query`, in thread order, within `token_budget`."""
+        chosen: list[int] = []
+        used = 0
+        for doc, _ in self.search(query, k, exclude_entries):
+            cost = estimate_tokens(self.snippets[doc])
+            if used + cost > token_budget:
+                continue
+            chosen.append(doc)
+            used += cost
+        return [self.snippets[d] for d in sorted(chosen)]
@@ -6,11 +6,22 @@ Uses Sonnet 4.6 with context compaction (beta) and 1M token context window.
 """
 
 import asyncio
-import anthropic
 import json
+import re
+import time
+from collections import Counter
 from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from agents.client import call_model, make_client
 from agents.config import SectorDef, CompanyDef
 from agents.company_agent import CompanyCoverageAgent, CompanyFinding, date_header
+from agents.brief import BriefStore, SectorBrief, build_sector_brief
+from agents import encoding
+from agents.budget import AnswerTruncated, BudgetExceeded, SectorBudget, TokenBudget, truncated
+from agents.cache import ResponseCache
+from agents.checkpoint import RunManifest
+from agents.history import FindingsStore
+from agents.retrieval import ThreadIndex
 
 
 SYSTEM_PROMPT_BASE = """You are {designation}, a senior equity research analyst
@@ -28,41 +39,155 @@ maintain a living sector thesis that OC can act on.
 """
 
 
-@dataclass
+def normalise_question(message: str) -> str:
+    """Canonical form of an OC question — case, whitespace and trailing punctuation ignored."""
+    return re.sub(r"\s+", " ", message).strip().rstrip("?!. ").lower()
+
+
+# Chat context: recent conversational turns sent verbatim, plus retrieved thread snippets
+CHAT_RECENT_TURNS = 6
+CHAT_CONTEXT_TOKENS = 6000
+CHAT_RETRIEVAL_K = 12
+
+# Deadline-aware sweeps: share of a sector's time budget held back for synthesis
+SYNTHESIS_RESERVE = 0.25
+SYNTHESIS_RESERVE_MAX_SECONDS = 60.0
+
+
+@dataclass(frozen=True, slots=True)
 class SectorSynthesis:
     sector_key: str
     designation: str
     posture: str  # "bullish" | "neutral" | "bearish"
     conviction: float  # 0-10
     thesis_summary: str
-    key_drivers: list[str]
-    key_risks: list[str]
-    company_signals: list[dict]
-    material_findings: list[dict]
+    key_drivers: tuple[str, ...]
+    key_risks: tuple[str, ...]
+    company_signals: tuple[CompanyFinding, ...]  # the sweep's findings, by reference
+    material_findings: tuple[CompanyFinding, ...]  # subset of company_signals, by reference
+    partial: bool = False  # True when some covered companies have no finding this run
+    missing_tickers: tuple[str, ...] = ()
+    _json: bytes | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for name in ("key_drivers", "key_risks", "company_signals", "material_findings", "missing_tickers"):
+            value = getattr(self, name)
+            if not isinstance(value, tuple):
+                object.__setattr__(self, name, tuple(value or ()))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SectorSynthesis":
+        """Rebuild from `to_dict()` output, e.g. a checkpoint or queue result."""
+        signals = tuple(CompanyFinding.from_dict(d) for d in data.get("company_signals", []))
+        by_ticker = {f.ticker: f for f in signals}
+        return cls(
+            sector_key=data["sector_key"],
+            designation=data["designation"],
+            posture=data.get("posture", "neutral"),
+            conviction=float(data.get("conviction", 5.0)),
+            thesis_summary=data.get("thesis_summary", ""),
+            key_drivers=data.get("key_drivers", ()),
+            key_risks=data.get("key_risks", ()),
+            company_signals=signals,
+            material_findings=tuple(
+                by_ticker.get(d.get("ticker")) or CompanyFinding.from_dict(d)
+                for d in data.get("material_findings", [])
+            ),
+            partial=data.get("partial", False),
+            missing_tickers=data.get("missing_tickers", ()),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            **self._header(),
+            "company_signals": [f.to_dict() for f in self.company_signals],
+            "material_findings": [f.to_dict() for f in self.material_findings],
+        }
+
+    def to_json(self) -> bytes:
+        """`to_dict()` as JSON bytes, spliced from each finding's cached encoding; cached."""
+        if self._json is None:
+            object.__setattr__(self, "_json", encoding.splice(
+                self._header(),
+                company_signals=b"[" + b",".join(f.to_json() for f in self.company_signals) + b"]",
+                material_findings=b"[" + b",".join(f.to_json() for f in self.material_findings) + b"]",
+            ))
+        return self._json
+
+    def _header(self) -> dict:
+        return {
+            "sector_key": self.sector_key,
+            "designation": self.designation,
+            "posture": self.posture,
+            "conviction": self.conviction,
+            "thesis_summary": self.thesis_summary,
+            "key_drivers": list(self.key_drivers),
+            "key_risks": list(self.key_risks),
+            "partial": self.partial,
+            "missing_tickers": list(self.missing_tickers),
+        }
 
 
 class SectorLeadAgent:
     """Lead agent for a sector — orchestrates sub-agents and maintains thread."""
 
-    def __init__(self, sector: SectorDef):
+    def __init__(
+        self,
+        sector: SectorDef,
+        history: FindingsStore | None = None,
+        budget: TokenBudget | None = None,
+        cache: ResponseCache | None = None,
+        briefs: BriefStore | None = None,
+    ):
         self.sector = sector
         self.key = sector.key
         self.designation = sector.designation
         self.name = sector.name
+        self.history = history
+        self.budget = budget or TokenBudget()
+        self.cache = cache
+        self.briefs = briefs
+        self.latest_brief: SectorBrief | None = briefs.get(sector.key) if briefs else None
         self._thread_history: list[dict] = []
-        self.client = anthropic.Anthropic()
+        self._index = ThreadIndex()
+        self._version = 0  # bumped whenever the thread's content changes
+        self.cached_replies = 0  # chats answered from the response cache (not re-recorded in the thread)
+        self._mailbox_lock: asyncio.Lock | None = None
+        self._mailbox_loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.client = make_client()
 
     def load_thread_history(self, history: list[dict]) -> None:
         """Load persisted thread history from database."""
         self._thread_history = history or []
+        self._index = ThreadIndex()
+        for i, entry in enumerate(self._thread_history):
+            self._index.add_entry(i, entry, self.designation)
+        self._bump_version()
 
     def export_thread(self) -> list[dict]:
         """Export current thread for persistence."""
         return self._thread_history
 
-    def _system_prompt(self) -> str:
-        """Build full system prompt with date header + OC identity."""
-        return (
+    @property
+    def thread_version(self) -> int:
+        return self._version
+
+    def _append(self, entry: dict) -> None:
+        """Append an entry to the thread and index it for chat retrieval."""
+        self._thread_history.append(entry)
+        self._index.add_entry(len(self._thread_history) - 1, entry, self.designation)
+        self._bump_version()
+
+    def _bump_version(self) -> None:
+        # Versions only increase, so entries cached under an older one can never hit again
+        self._version += 1
+        if self.cache is not None:
+            self.cache.invalidate(self.key)
+
+    def _system_prompt(self, context: list[str] | None = None) -> str:
+        """Build full system prompt with date header + OC identity + retrieved thread context."""
+        prompt = (
             date_header()
             + SYSTEM_PROMPT_BASE.format(
                 designation=self.designation,
@@ -70,9 +195,46 @@ class SectorLeadAgent:
             )
             + f"\nSector context: {self.sector.system_context}\n"
         )
+        if context:
+            prompt += (
+                "\nRelevant earlier thread context (sweeps, syntheses and conversations):\n"
+                + "\n".join(f"- {snippet}" for snippet in context)
+                + "\n"
+            )
+        return prompt
+
+    async def run_daily_sweep(
+        self,
+        manifest: RunManifest | None = None,
+        budget: TokenBudget | None = None,
+        time_limit: float | None = None,
+        tickers: set[str] | None = None,
+    ) -> SectorSynthesis:
+        """Run sweep across all companies and synthesise sector view.
+
+        With a manifest, completed company findings and a completed synthesis are
+        reused from the checkpoint and new results are checkpointed as they arrive.
+        `budget` (default: the agent's own) caps token spend; companies that no
+        longer fit are skipped and synthesis falls back to a local roll-up.
+        `time_limit` (seconds) bounds the whole sector: company sweeps still running
+        when the sweep phase ends are cancelled, and the synthesis is marked partial
+        with the tickers that produced no finding.
+        `tickers` restricts the sweep to a subset of covered companies (see
+        agents.triggers); the synthesis is told the rest were not swept today.
+        """
+        started = time.monotonic()
+        deadline = started + time_limit if time_limit is not None else None
+        sweep_deadline = None
+        if time_limit is not None:
+            reserve = min(time_limit * SYNTHESIS_RESERVE, SYNTHESIS_RESERVE_MAX_SECONDS)
+            sweep_deadline = started + time_limit - reserve
+        sector_budget = (budget or self.budget).for_sector(self.key)
+        if manifest is not None:
+            done = manifest.sector(self.key)
+            if done is not None:
+                async with self._mailbox():
+                    return self._restore_checkpoint(manifest.run_id, done)
 
-    async def run_daily_sweep(self) -> SectorSynthesis:
-        """Run sweep across all companies and synthesise sector view."""
         agents = [
             CompanyCoverageAgent(
                 ticker=c.ticker,
@@ -81,11 +243,15 @@ class SectorLeadAgent:
                 sector_context=self.sector.system_context,
             )
             for c in self.sector.companies
+            if tickers is None or c.ticker in tickers
         ]
 
-        findings: list[CompanyFinding] = await asyncio.gather(
-            *[agent.sweep() for agent in agents]
+        swept = await self._gather_until(
+            [self._sweep_company(agent, manifest, sector_budget, deadline=sweep_deadline) for agent in agents],
+            sweep_deadline,
         )
+        findings: list[CompanyFinding] = [f for f in swept if f is not None]
+        missing = [agent.ticker for agent, f in zip(agents, swept) if f is None]
 
         # Identify escalations for deep-dive
         escalations = [f for f in findings if f.requires_escalation]
@@ -99,74 +265,348 @@ class SectorLeadAgent:
                 )
                 for f in escalations
             ]
-            deep_findings = await asyncio.gather(
-                *[a.sweep(effort="high") for a in deep_agents]
+            deep_findings = await self._gather_until(
+                [
+                    self._sweep_company(a, manifest, sector_budget, effort="high", deadline=sweep_deadline)
+                    for a in deep_agents
+                ],
+                sweep_deadline,
             )
-            deep_map = {f.ticker: f for f in deep_findings}
+            deep_map = {f.ticker: f for f in deep_findings if f is not None}
             findings = [deep_map.get(f.ticker, f) for f in findings]
 
-        synthesis = await self._synthesise(findings)
+        synthesis, sweep_entry = await self.synthesise_sweep(
+            findings,
+            run_id=manifest.run_id if manifest is not None else None,
+            budget=sector_budget,
+            missing=missing,
+            deadline=deadline,
+        )
+        async with self._mailbox():
+            self.apply_sweep(findings, synthesis, sweep_entry)
+
+        if manifest is not None:
+            manifest.record_sector(self.key, synthesis, sweep_entry)
+
+        return synthesis
 
-        # Append sweep to thread history
-        sweep_entry = {
+    async def sweep_company(self, ticker: str, budget: TokenBudget | None = None) -> CompanyFinding:
+        """Sweep a single covered company, deep-diving if it escalates. Used by queue workers.
+
+        `budget` (default: the agent's own) is charged for both calls.
+        """
+        company = next((c for c in self.sector.companies if c.ticker == ticker), None)
+        if company is None:
+            raise ValueError(f"{ticker} is not covered by {self.designation}")
+        sector_budget = (budget or self.budget).for_sector(self.key)
+        finding = await CompanyCoverageAgent(
+            ticker=company.ticker,
+            exchange=company.exchange,
+            company_name=company.name,
+            sector_context=self.sector.system_context,
+        ).sweep(budget=sector_budget)
+        if finding.requires_escalation:
+            try:
+                finding = await CompanyCoverageAgent(
+                    ticker=finding.ticker,
+                    exchange="",
+                    company_name=finding.company_name,
+                    sector_context=self.sector.system_context,
+                ).sweep(effort="high", budget=sector_budget)
+            except (BudgetExceeded, AnswerTruncated) as exc:
+                print(f"{self.designation}: escalation for {ticker} skipped — {exc}")
+        return finding
+
+    async def synthesise_sweep(
+        self,
+        findings: list[CompanyFinding],
+        run_id: str | None = None,
+        budget: SectorBudget | None = None,
+        missing: list[str] | None = None,
+        deadline: float | None = None,
+        fallback_on_error: bool = False,
+    ) -> tuple[SectorSynthesis, dict]:
+        """Synthesise findings and build the sweep entry without touching the thread.
+
+        `missing` lists covered tickers with no finding; the synthesis is then
+        flagged partial. If the model call cannot finish by `deadline`
+        (time.monotonic()), the local roll-up is used instead — as it is for a
+        failed call when `fallback_on_error` is set (e.g. a queue unit's last attempt).
+        """
+        budget = budget or self.budget.for_sector(self.key)
+        missing = missing or []
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            synthesis = await asyncio.wait_for(self._synthesise(findings, budget, missing, deadline), timeout)
+        except asyncio.TimeoutError:
+            print(f"{self.designation}: synthesis cut off at deadline — using local roll-up")
+            return self.rollup_sweep(findings, run_id, missing, reason="Deadline reached")
+        except Exception as exc:
+            if not fallback_on_error:
+                raise
+            print(f"{self.designation}: synthesis failed — using local roll-up ({exc!r})")
+            return self.rollup_sweep(findings, run_id, missing, reason="Synthesis failed")
+        return synthesis, self._sweep_entry(findings, synthesis, run_id)
+
+    def rollup_sweep(
+        self,
+        findings: list[CompanyFinding],
+        run_id: str | None = None,
+        missing: list[str] | None = None,
+        reason: str = "Synthesis unavailable",
+    ) -> tuple[SectorSynthesis, dict]:
+        """Local roll-up synthesis and sweep entry — no model call."""
+        synthesis = self._fallback_synthesis(
+            findings,
+            [f for f in findings if f.finding_type == "material"],
+            missing,
+            reason=reason,
+        )
+        return synthesis, self._sweep_entry(findings, synthesis, run_id)
+
+    def _sweep_entry(
+        self,
+        findings: list[CompanyFinding],
+        synthesis: SectorSynthesis,
+        run_id: str | None = None,
+    ) -> dict:
+        entry = {
             "role": "system",
             "type": "sweep",
             "timestamp": self._now(),
-            "findings": [self._finding_to_dict(f) for f in findings],
+            "findings": [f.summary() for f in findings],
             "synthesis": {
                 "posture": synthesis.posture,
                 "conviction": synthesis.conviction,
                 "thesis_summary": synthesis.thesis_summary,
             },
         }
-        self._thread_history.append(sweep_entry)
-
+        if synthesis.partial:
+            entry["missing_tickers"] = list(synthesis.missing_tickers)
+        if run_id is not None:
+            entry["run_id"] = run_id
+        return entry
+
+    def apply_sweep(
+        self,
+        findings: list[CompanyFinding],
+        synthesis: SectorSynthesis,
+        sweep_entry: dict,
+    ) -> bool:
+        """Append a sweep to the thread and findings store. Skips runs already applied."""
+        run_id = sweep_entry.get("run_id")
+        if run_id is not None and any(e.get("run_id") == run_id for e in self._thread_history):
+            return False
+        self._append(sweep_entry)
+        if self.history is not None:
+            self.history.record_sweep(
+                self.key, findings, synthesis.posture, synthesis.conviction,
+            )
+        self._materialise_brief(synthesis, run_id)
+        return True
+
+    def _materialise_brief(self, synthesis: SectorSynthesis, run_id: str | None) -> SectorBrief:
+        """Build the post-sweep brief (diffed against the last one) and publish it to the store."""
+        self.latest_brief = build_sector_brief(synthesis, self.latest_brief, run_id)
+        if self.briefs is not None:
+            self.briefs.put(self.latest_brief)
+        return self.latest_brief
+
+    async def _sweep_company(
+        self,
+        agent: CompanyCoverageAgent,
+        manifest: RunManifest | None,
+        budget: SectorBudget,
+        effort: str = "low",
+        deadline: float | None = None,
+    ) -> CompanyFinding | None:
+        """Sweep one company, reusing and recording checkpoints when a manifest is given.
+
+        Returns None when the token budget cannot cover the call or the call
+        fails (API error, timeout at `deadline`); the sector carries on without it.
+        """
+        stage = "escalation" if effort == "high" else "sweep"
+        if manifest is not None:
+            cached = manifest.finding(self.key, agent.ticker, stage)
+            if cached is not None:
+                return cached
+        try:
+            finding = await agent.sweep(effort=effort, budget=budget, deadline=deadline)
+        except BudgetExceeded as exc:
+            print(f"{self.designation}: {stage} for {agent.ticker} skipped — {exc}")
+            return None
+        except Exception as exc:
+            print(f"{self.designation}: {stage} for {agent.ticker} failed — {exc!r}")
+            return None
+        if manifest is not None:
+            manifest.record_finding(self.key, finding, stage)
+        return finding
+
+    async def _gather_until(self, coros: list, deadline: float | None) -> list:
+        """Run coroutines concurrently; any still running at `deadline` are cancelled and yield None.
+
+        A coroutine that raises also yields None (logged), so one failure leaves
+        the rest of the sector's results intact.
+        """
+        tasks = [asyncio.ensure_future(c) for c in coros]
+        if not tasks:
+            return []
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        results = []
+        for task in tasks:
+            if task not in done or task.cancelled():
+                results.append(None)
+            elif task.exception() is not None:
+                print(f"{self.designation}: unit failed — {task.exception()!r}")
+                results.append(None)
+            else:
+                results.append(task.result())
+        return results
+
+    def _restore_checkpoint(self, run_id: str, done: dict) -> SectorSynthesis:
+        """Rebuild a completed sector's result, re-appending its sweep entry if the thread lost it."""
+        if not any(e.get("run_id") == run_id for e in self._thread_history):
+            self._append(done["sweep_entry"])
+        synthesis = done["synthesis"]
+        if not isinstance(synthesis, SectorSynthesis):
+            synthesis = SectorSynthesis.from_dict(synthesis)
+        if self.latest_brief is None or self.latest_brief.run_id != run_id:
+            self._materialise_brief(synthesis, run_id)
         return synthesis
 
+    def _mailbox(self) -> asyncio.Lock:
+        """Per-sector lock serialising every thread mutation (chats and sweep appends).
+
+        Locks and in-flight futures are bound to an event loop, so both are
+        recreated if the agent is driven from a new loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._mailbox_loop is not loop:
+            self._mailbox_lock = asyncio.Lock()
+            self._mailbox_loop = loop
+            self._inflight = {}
+        return self._mailbox_lock
+
     async def chat(self, message: str) -> str:
-        """Handle OC chat message and return agent reply."""
-        self._thread_history.append({
+        """Handle OC chat message and return agent reply.
+
+        Ordering guarantee: chats to one sector are served one at a time, in
+        arrival order, each against the thread as it stands when its turn comes.
+        A question and its reply are always adjacent in the thread; a sweep that
+        finishes mid-chat is appended after that exchange and is visible to the
+        next chat. Different sectors are served in parallel. An identical
+        question already in flight for this sector is not re-sent — callers
+        share its reply and the exchange is recorded once.
+
+        The exchange runs as its own task and every caller awaits it shielded,
+        so cancelling one caller (even the one that started it) leaves the
+        others waiting on the same reply, and the exchange still completes.
+        """
+        self._mailbox()
+        key = normalise_question(message)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._serve_chat(message))
+            # Mark any exception retrieved so a failure nobody awaits any more is not logged as lost
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            task.add_done_callback(lambda t: self._inflight.get(key) is t and self._inflight.pop(key))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _serve_chat(self, message: str) -> str:
+        """Run one chat exchange under the mailbox lock."""
+        async with self._mailbox():
+            return await self._chat(message)
+
+    async def _chat(self, message: str) -> str:
+        """Run one chat exchange. Caller holds the mailbox lock.
+
+        Raises AnswerTruncated if the reply hit max_tokens; OC's message stays
+        in the thread unanswered and nothing is cached.
+        """
+        question = normalise_question(message)
+        if self.cache is not None:
+            cached = self.cache.get(self.key, question, self._version)
+            if cached is not None:
+                # The exchange is already the latest in the thread; counted, not appended again
+                self.cached_replies += 1
+                return cached
+
+        messages, context = self._build_chat_messages(message)
+        system = self._system_prompt(context)
+        budget = self.budget.for_sector(self.key)
+        plan = budget.plan("chat", system + json.dumps(messages))
+        self._append({
             "role": "user",
             "type": "oc_message",
             "timestamp": self._now(),
             "content": message,
         })
 
-        messages = self._build_chat_messages()
-        messages.append({"role": "user", "content": message})
-
-        response = self.client.messages.create(
+        response = await call_model(
+            self.client.messages.create,
+            budget=budget,
+            plan=plan,
             model="claude-sonnet-4-6-20250929",
-            max_tokens=4096,
+            max_tokens=plan.max_tokens,
             betas=["interleaved-thinking-2025-05-14"],
-            system=self._system_prompt(),
+            system=system,
             messages=messages,
-            thinking={
-                "type": "enabled",
-                "budget_tokens": 4096,
-            },
+            thinking=plan.thinking,
         )
 
         reply = ""
         for block in response.content:
             if hasattr(block, "text"):
                 reply += block.text
+        budget.record(plan, response, reply)
+        if truncated(response):
+            # A cut-off reply is neither recorded in the thread nor cached
+            raise AnswerTruncated(f"{self.designation} chat reply hit max_tokens ({plan.max_tokens})")
 
-        self._thread_history.append({
+        self._append({
             "role": "assistant",
             "type": "agent_response",
             "timestamp": self._now(),
             "content": reply,
         })
 
+        if self.cache is not None:
+            # Keyed on the version that includes this exchange: asking again unchanged is a hit
+            self.cache.put(self.key, question, self._version, reply)
+
         return reply
 
-    async def _synthesise(self, findings: list[CompanyFinding]) -> SectorSynthesis:
+    async def _synthesise(
+        self,
+        findings: list[CompanyFinding],
+        budget: SectorBudget,
+        missing: list[str] | None = None,
+        deadline: float | None = None,
+    ) -> SectorSynthesis:
         """Synthesise individual findings into a sector-level view."""
+        missing = missing or []
         findings_text = "\n".join(
             f"- {f.company_name} ({f.ticker}): [{f.finding_type}] {f.headline}"
             for f in findings
         )
+        if missing:
+            findings_text += (
+                f"\n\nCoverage is partial — no results today for: {', '.join(missing)}. "
+                "Do not infer anything about these names."
+            )
+        swept = {f.ticker for f in findings} | set(missing)
+        unscheduled = [c.ticker for c in self.sector.companies if c.ticker not in swept]
+        if unscheduled:
+            findings_text += (
+                f"\n\nNot scheduled for a sweep today (no price, volume or calendar trigger): "
+                f"{', '.join(unscheduled)}. Carry forward your existing view on these names."
+            )
         material = [f for f in findings if f.finding_type == "material"]
 
         prompt = (
@@ -178,10 +618,20 @@ class SectorLeadAgent:
             '"thesis_summary": "...", "key_drivers": ["..."], "key_risks": ["..."]}'
         )
 
-        response = self.client.messages.create(
+        try:
+            plan = budget.plan("synthesis", prompt)
+        except BudgetExceeded as exc:
+            print(f"{self.designation}: synthesis skipped — {exc}")
+            return self._fallback_synthesis(findings, material, missing)
+
+        response = await call_model(
+            self.client.messages.create,
+            deadline=deadline,
+            budget=budget,
+            plan=plan,
             model="claude-sonnet-4-6-20250929",
-            max_tokens=2048,
-            thinking={"type": "enabled", "budget_tokens": 2048},
+            max_tokens=plan.max_tokens,
+            thinking=plan.thinking,
             messages=[{"role": "user", "content": prompt}],
         )
 
@@ -189,8 +639,11 @@ class SectorLeadAgent:
         for block in response.content:
             if hasattr(block, "text"):
                 text += block.text
+        budget.record(plan, response, text)
+        if truncated(response):
+            print(f"{self.designation}: synthesis hit max_tokens — using local roll-up")
+            return self._fallback_synthesis(findings, material, missing, reason="Synthesis truncated")
 
-        import re
         try:
             match = re.search(r"\{[\s\S]*\}", text)
             data = json.loads(match.group()) if match else {}
@@ -205,34 +658,79 @@ class SectorLeadAgent:
             thesis_summary=data.get("thesis_summary", ""),
             key_drivers=data.get("key_drivers", []),
             key_risks=data.get("key_risks", []),
-            company_signals=[self._finding_to_dict(f) for f in findings],
-            material_findings=[self._finding_to_dict(f) for f in material],
+            company_signals=tuple(findings),
+            material_findings=tuple(material),
+            partial=bool(missing),
+            missing_tickers=list(missing),
         )
 
-    def _build_chat_messages(self) -> list[dict]:
-        """Build Claude-compatible message list from thread history."""
-        messages = []
-        for entry in self._thread_history[-20:]:
-            if entry.get("type") in ("oc_message", "pm_message"):
-                messages.append({"role": "user", "content": entry["content"]})
-            elif entry.get("type") == "agent_response":
-                messages.append({"role": "assistant", "content": entry["content"]})
-        return messages
+    def _fallback_synthesis(
+        self,
+        findings: list[CompanyFinding],
+        material: list[CompanyFinding],
+        missing: list[str] | None = None,
+        reason: str = "Token budget exhausted",
+    ) -> SectorSynthesis:
+        """Local roll-up of company signals, used when no model call fits the budget or deadline."""
+        signals = Counter(f.signal for f in findings)
+        bullish, bearish = signals["bullish"], signals["bearish"]
+        posture = "bullish" if bullish > bearish else "bearish" if bearish > bullish else "neutral"
+        return SectorSynthesis(
+            sector_key=self.key,
+            designation=self.designation,
+            posture=posture,
+            conviction=5.0,
+            thesis_summary=(
+                f"{reason} — posture rolled up from company signals "
+                f"({bullish} bullish, {bearish} bearish of {len(findings)})."
+            ),
+            key_drivers=[f.headline for f in material],
+            key_risks=[],
+            company_signals=tuple(findings),
+            material_findings=tuple(material),
+            partial=bool(missing),
+            missing_tickers=list(missing or []),
+        )
 
-    @staticmethod
-    def _finding_to_dict(f: CompanyFinding) -> dict:
-        return {
-            "ticker": f.ticker,
-            "company_name": f.company_name,
-            "finding_type": f.finding_type,
-            "headline": f.headline,
-            "detail": f.detail,
-            "signal": f.signal,
-            "category": f.category,
-            "assessment": f.assessment,
-        }
+    def _build_chat_messages(self, message: str) -> tuple[list[dict], list[str]]:
+        """Build Claude-compatible messages (recent turns + `message`) and retrieved context.
+
+        Only the last CHAT_RECENT_TURNS conversational entries are sent verbatim;
+        anything older — including sweep findings — reaches the prompt through
+        retrieval, capped at CHAT_CONTEXT_TOKENS.
+        """
+        recent: list[int] = []
+        for i in range(len(self._thread_history) - 1, -1, -1):
+            if len(recent) == CHAT_RECENT_TURNS:
+                break
+            if self._thread_history[i].get("type") in ("oc_message", "pm_message", "agent_response"):
+                recent.append(i)
+        recent.reverse()
+
+        messages: list[dict] = []
+        for i in recent:
+            entry = self._thread_history[i]
+            role = "assistant" if entry["type"] == "agent_response" else "user"
+            if not messages and role == "assistant":
+                continue
+            if messages and messages[-1]["role"] == role:
+                # An unanswered message leaves two same-role turns; merge to keep alternation
+                messages[-1]["content"] += "\n\n" + entry["content"]
+            else:
+                messages.append({"role": role, "content": entry["content"]})
+        if messages and messages[-1]["role"] == "user":
+            messages[-1]["content"] += "\n\n" + message
+        else:
+            messages.append({"role": "user", "content": message})
+
+        context = self._index.context(
+            message,
+            token_budget=CHAT_CONTEXT_TOKENS,
+            k=CHAT_RETRIEVAL_K,
+            exclude_entries=set(recent),
+        )
+        return messages, context
 
     @staticmethod
     def _now() -> str:
-        from datetime import datetime, timezone
         return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,241 @@
+"""
+Sweep triggers — choose which companies get a full sweep from cheap local signals.
+
+Inputs are the dated market snapshots written by scripts/update_market_caps.py
+(market cap, last price, volume vs average per company), an earnings calendar
+and, optionally, the findings history. A company is swept when its price or
+market cap moved beyond a threshold since the previous snapshot, when it reports
+within the earnings window, or when volume runs well above its average.
+Everything else rotates: each untriggered company is still swept once every
+`rotation_days`, on a day fixed by a hash of its ticker so load spreads evenly.
+
+    python -m agents.triggers                  # tonight's selection from the latest snapshots
+    python -m agents.triggers --on 2026-03-02 --seed data/seed.json
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from agents.config import SECTORS, SectorDef
+from agents.history import FindingsStore
+
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "market_snapshots")
+# Optional per-company keys that carry a reporting date in seed profiles / earnings rows.
+# A generic "date" is deliberately absent: earnings rows date periods and estimates too.
+EARNINGS_DATE_KEYS = ("next_earnings_date", "earnings_date", "report_date", "reportDate")
+
+
+@dataclass
+class MarketSnapshot:
+    as_of: date
+    companies: dict[str, dict]  # ticker → {"market_cap_usd", "price", "volume", "avg_volume"}
+
+
+@dataclass
+class Trigger:
+    ticker: str
+    reason: str  # "price_move" | "earnings" | "volume" | "stale" | "no_snapshot"
+    detail: str = ""
+
+
+@dataclass
+class SweepSelection:
+    on: date
+    scheduled: dict[str, list[str]]  # sector_key → tickers to sweep
+    triggers: dict[str, list[Trigger]] = field(default_factory=dict)  # ticker → why it was triggered
+    rotation: list[str] = field(default_factory=list)  # tickers swept only because their rotation day came up
+
+    def tickers(self, sector_key: str) -> set[str]:
+        return set(self.scheduled.get(sector_key, []))
+
+    @property
+    def total(self) -> int:
+        return sum(len(t) for t in self.scheduled.values())
+
+    def summary(self, covered: int | None = None) -> str:
+        of = f" of {covered}" if covered is not None else ""
+        lines = [
+            f"Sweep selection for {self.on}: {self.total}{of} companies "
+            f"({len(self.triggers)} triggered, {len(self.rotation)} rotation)"
+        ]
+        for ticker, triggers in sorted(self.triggers.items()):
+            lines.append(f"  {ticker:<10} " + "; ".join(f"{t.reason}: {t.detail}" if t.detail else t.reason for t in triggers))
+        return "\n".join(lines)
+
+
+# ── Inputs ──
+
+def load_snapshot(path: str) -> MarketSnapshot:
+    with open(path) as fh:
+        data = json.load(fh)
+    as_of = data.get("as_of") or os.path.splitext(os.path.basename(path))[0]
+    return MarketSnapshot(date.fromisoformat(as_of), data.get("companies", {}))
+
+
+def latest_snapshots(
+    directory: str = SNAPSHOT_DIR,
+    on: date | None = None,
+) -> tuple[MarketSnapshot | None, MarketSnapshot | None]:
+    """(current, previous) — the two newest snapshots dated on or before `on`."""
+    on = on or date.today()
+    paths = sorted(
+        p for p in glob.glob(os.path.join(directory, "*.json"))
+        if os.path.splitext(os.path.basename(p))[0] <= on.isoformat()
+    )
+    current = load_snapshot(paths[-1]) if paths else None
+    previous = load_snapshot(paths[-2]) if len(paths) > 1 else None
+    return current, previous
+
+
+def load_earnings_calendar(seed_path: str) -> dict[str, list[date]]:
+    """Reporting dates per ticker from a seed file's company profiles.
+
+    Reads a `next_earnings_date`-style key (EARNINGS_DATE_KEYS) on the profile
+    or on rows of its `earnings` table; companies without one are simply absent.
+    """
+    with open(seed_path) as fh:
+        companies = json.load(fh).get("companies", [])
+    calendar: dict[str, list[date]] = {}
+    for company in companies:
+        profile = company.get("profile_json") or {}
+        candidates = [profile] + [r for r in profile.get("earnings", []) if isinstance(r, dict)]
+        dates = set()
+        for record in candidates:
+            for key in EARNINGS_DATE_KEYS:
+                value = record.get(key)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    dates.add(date.fromisoformat(value[:10]))
+                except ValueError:
+                    pass
+        if dates:
+            calendar[company["id"]] = sorted(dates)
+    return calendar
+
+
+# ── Engine ──
+
+class TriggerEngine:
+    """Decides each night's sweep set from price, volume and calendar signals."""
+
+    def __init__(
+        self,
+        move_threshold: float = 0.05,
+        volume_ratio: float = 2.5,
+        earnings_before: int = 1,
+        earnings_after: int = 1,
+        rotation_days: int = 7,
+        calendar: dict[str, list[date]] | None = None,
+        history: FindingsStore | None = None,
+    ):
+        self.move_threshold = move_threshold
+        self.volume_ratio = volume_ratio
+        self.earnings_before = earnings_before
+        self.earnings_after = earnings_after
+        self.rotation_days = max(1, rotation_days)
+        self.calendar = calendar or {}
+        self.history = history
+
+    def triggers(
+        self,
+        ticker: str,
+        current: MarketSnapshot | None,
+        previous: MarketSnapshot | None,
+        on: date,
+    ) -> list[Trigger]:
+        """Every trigger that fires for `ticker` on `on`."""
+        fired: list[Trigger] = []
+        now = current.companies.get(ticker) if current else None
+        before = previous.companies.get(ticker) if previous else None
+
+        if now and before:
+            for key in ("price", "market_cap_usd"):
+                if now.get(key) and before.get(key):
+                    move = now[key] / before[key] - 1
+                    if abs(move) >= self.move_threshold:
+                        fired.append(Trigger(ticker, "price_move", f"{key} {move:+.1%} since {previous.as_of}"))
+                    break
+
+        if now and now.get("volume") and now.get("avg_volume"):
+            ratio = now["volume"] / now["avg_volume"]
+            if ratio >= self.volume_ratio:
+                fired.append(Trigger(ticker, "volume", f"{ratio:.1f}× average volume"))
+
+        for reported in self.calendar.get(ticker, []):
+            if -self.earnings_after <= (reported - on).days <= self.earnings_before:
+                fired.append(Trigger(ticker, "earnings", f"reports {reported}"))
+                break
+
+        if self.history is not None:
+            seen = self.history.ticker_history(ticker)
+            last = seen[-1][0] if seen else None
+            if last is None or on - last >= timedelta(days=self.rotation_days):
+                fired.append(Trigger(ticker, "stale", f"last swept {last}" if last else "never swept"))
+
+        return fired
+
+    def due_for_rotation(self, ticker: str, on: date) -> bool:
+        slot = int.from_bytes(hashlib.sha256(ticker.encode()).digest()[:4], "big") % self.rotation_days
+        return slot == on.toordinal() % self.rotation_days
+
+    def select(
+        self,
+        sectors: dict[str, SectorDef] | None = None,
+        current: MarketSnapshot | None = None,
+        previous: MarketSnapshot | None = None,
+        on: date | None = None,
+    ) -> SweepSelection:
+        """Tickers to sweep per sector. With no current snapshot every company is swept."""
+        sectors = sectors if sectors is not None else SECTORS
+        on = on or date.today()
+        selection = SweepSelection(on=on, scheduled={})
+        for key, sector in sectors.items():
+            chosen: list[str] = []
+            for company in sector.companies:
+                if current is None:
+                    fired = [Trigger(company.ticker, "no_snapshot")]
+                else:
+                    fired = self.triggers(company.ticker, current, previous, on)
+                if fired:
+                    selection.triggers[company.ticker] = fired
+                    chosen.append(company.ticker)
+                elif self.due_for_rotation(company.ticker, on):
+                    selection.rotation.append(company.ticker)
+                    chosen.append(company.ticker)
+            if chosen:
+                selection.scheduled[key] = chosen
+        return selection
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show the triggered sweep selection.")
+    parser.add_argument("--on", type=date.fromisoformat, default=None, help="run date (default: today)")
+    parser.add_argument("--snapshots", default=SNAPSHOT_DIR, help="market snapshot directory")
+    parser.add_argument("--seed", default=None, help="seed file to read earnings dates from")
+    parser.add_argument("--history", default=None, help="findings store directory")
+    parser.add_argument("--move-threshold", type=float, default=0.05)
+    parser.add_argument("--volume-ratio", type=float, default=2.5)
+    parser.add_argument("--rotation-days", type=int, default=7)
+    args = parser.parse_args()
+
+    current, previous = latest_snapshots(args.snapshots, args.on)
+    engine = TriggerEngine(
+        move_threshold=args.move_threshold,
+        volume_ratio=args.volume_ratio,
+        rotation_days=args.rotation_days,
+        calendar=load_earnings_calendar(args.seed) if args.seed else None,
+        history=FindingsStore(args.history) if args.history else None,
+    )
+    selection = engine.select(current=current, previous=previous, on=args.on)
+    print(selection.summary(covered=sum(len(s.companies) for s in SECTORS.values())))
+
+
+if __name__ == "__main__":
+    main()
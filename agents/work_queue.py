@@ -0,0 +1,211 @@
+"""
+WorkQueue — durable queue of sweep work units shared by any number of workers.
+
+KabutenOrchestrator enqueues one "company" unit per covered company; workers
+lease units, execute them and ack the result. Once every company unit for a
+sector is settled (done or dead-lettered) a "sector" unit is enqueued to run
+the synthesis. Leases expire after a visibility timeout so a crashed worker's
+units are picked up again; units that exhaust their attempts are dead-lettered.
+
+SQLiteWorkQueue is the default backend. Other backends subclass WorkQueue and
+must implement every abstract method.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class WorkUnit:
+    id: int
+    run_id: str
+    kind: str  # "company" | "sector"
+    sector_key: str
+    ticker: str = ""
+    attempts: int = 0
+    payload: dict = field(default_factory=dict)
+
+
+class WorkQueue(ABC):
+    """Backend interface for the sweep work queue."""
+
+    max_attempts: int = 3  # leases per unit before it is dead-lettered
+
+    @abstractmethod
+    def enqueue(
+        self,
+        run_id: str,
+        kind: str,
+        sector_key: str,
+        ticker: str = "",
+        payload: dict | None = None,
+    ) -> bool:
+        """Add a unit. Idempotent per (run_id, kind, sector_key, ticker); returns True if new."""
+
+    @abstractmethod
+    def lease(self, worker_id: str, visibility_timeout: float) -> WorkUnit | None:
+        """Claim the next available unit for `visibility_timeout` seconds."""
+
+    @abstractmethod
+    def ack(self, unit: WorkUnit, result: dict | bytes) -> None:
+        """Mark a leased unit done and store its result (a dict, or already-encoded JSON)."""
+
+    @abstractmethod
+    def nack(self, unit: WorkUnit, error: str) -> None:
+        """Release a failed unit for retry, or dead-letter it once attempts are exhausted."""
+
+    @abstractmethod
+    def ready_sectors(self) -> list[tuple[str, str]]:
+        """(run_id, sector_key) pairs whose company units are settled but have no sector unit yet."""
+
+    @abstractmethod
+    def results(self, run_id: str, kind: str, sector_key: str | None = None) -> dict[tuple[str, str], dict]:
+        """Results of done units, keyed by (sector_key, ticker)."""
+
+    @abstractmethod
+    def counts(self, run_id: str) -> dict[str, int]:
+        """Unit counts by status for a run."""
+
+    @abstractmethod
+    def dead_letters(self, run_id: str) -> list[WorkUnit]:
+        """Units that exhausted their attempts, in enqueue order."""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """WorkQueue backed by a single SQLite file — safe across processes on one host or a shared volume."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS units (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id       TEXT NOT NULL,
+            kind         TEXT NOT NULL,
+            sector_key   TEXT NOT NULL,
+            ticker       TEXT NOT NULL DEFAULT '',
+            payload      TEXT NOT NULL DEFAULT '{}',
+            status       TEXT NOT NULL DEFAULT 'pending',
+            attempts     INTEGER NOT NULL DEFAULT 0,
+            leased_by    TEXT,
+            leased_until REAL,
+            result       TEXT,
+            error        TEXT,
+            UNIQUE (run_id, kind, sector_key, ticker)
+        );
+        CREATE INDEX IF NOT EXISTS units_status ON units (status, leased_until);
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def enqueue(self, run_id, kind, sector_key, ticker="", payload=None) -> bool:
+        cur = self._conn.execute(
+            "INSERT OR IGNORE INTO units (run_id, kind, sector_key, ticker, payload) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (run_id, kind, sector_key, ticker, json.dumps(payload or {})),
+        )
+        return cur.rowcount == 1
+
+    def lease(self, worker_id, visibility_timeout) -> WorkUnit | None:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that already used every attempt go straight to the dead-letter set
+            self._conn.execute(
+                "UPDATE units SET status = 'dead', error = COALESCE(error, 'lease expired') "
+                "WHERE status = 'leased' AND leased_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = self._conn.execute(
+                "SELECT id, run_id, kind, sector_key, ticker, attempts, payload FROM units "
+                "WHERE status = 'pending' OR (status = 'leased' AND leased_until < ?) "
+                "ORDER BY kind = 'sector' DESC, id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+            self._conn.execute(
+                "UPDATE units SET status = 'leased', attempts = attempts + 1, "
+                "leased_by = ?, leased_until = ? WHERE id = ?",
+                (worker_id, now + visibility_timeout, row[0]),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return WorkUnit(
+            id=row[0],
+            run_id=row[1],
+            kind=row[2],
+            sector_key=row[3],
+            ticker=row[4],
+            attempts=row[5] + 1,
+            payload=json.loads(row[6]),
+        )
+
+    def ack(self, unit, result) -> None:
+        self._conn.execute(
+            "UPDATE units SET status = 'done', result = ?, leased_until = NULL "
+            "WHERE id = ? AND status != 'done'",
+            (result.decode() if isinstance(result, bytes) else json.dumps(result), unit.id),
+        )
+
+    def nack(self, unit, error) -> None:
+        status = "dead" if unit.attempts >= self.max_attempts else "pending"
+        self._conn.execute(
+            "UPDATE units SET status = ?, error = ?, leased_until = NULL "
+            "WHERE id = ? AND status = 'leased' AND attempts = ?",
+            (status, error, unit.id, unit.attempts),
+        )
+
+    def ready_sectors(self) -> list[tuple[str, str]]:
+        rows = self._conn.execute(
+            "SELECT c.run_id, c.sector_key FROM units c "
+            "WHERE c.kind = 'company' "
+            "GROUP BY c.run_id, c.sector_key "
+            "HAVING SUM(c.status IN ('pending', 'leased')) = 0 "
+            "AND NOT EXISTS (SELECT 1 FROM units s WHERE s.kind = 'sector' "
+            "AND s.run_id = c.run_id AND s.sector_key = c.sector_key)"
+        ).fetchall()
+        return [(r[0], r[1]) for r in rows]
+
+    def results(self, run_id, kind, sector_key=None) -> dict[tuple[str, str], dict]:
+        query = "SELECT sector_key, ticker, result FROM units WHERE run_id = ? AND kind = ? AND status = 'done'"
+        params: tuple = (run_id, kind)
+        if sector_key is not None:
+            query += " AND sector_key = ?"
+            params += (sector_key,)
+        return {(r[0], r[1]): json.loads(r[2]) for r in self._conn.execute(query, params)}
+
+    def counts(self, run_id) -> dict[str, int]:
+        rows = self._conn.execute(
+            "SELECT status, COUNT(*) FROM units WHERE run_id = ? GROUP BY status", (run_id,),
+        )
+        return dict(rows.fetchall())
+
+    def dead_letters(self, run_id) -> list[WorkUnit]:
+        rows = self._conn.execute(
+            "SELECT id, run_id, kind, sector_key, ticker, attempts, payload FROM units "
+            "WHERE run_id = ? AND status = 'dead' ORDER BY id",
+            (run_id,),
+        )
+        return [
+            WorkUnit(id=r[0], run_id=r[1], kind=r[2], sector_key=r[3], ticker=r[4],
+                     attempts=r[5], payload=json.loads(r[6]))
+            for r in rows
+        ]
@@ -0,0 +1,159 @@
+"""
+Sweep worker — leases work units from a WorkQueue, executes them and acks results.
+
+Run as many workers as needed against the same queue; throughput scales with
+the number of workers:
+
+    python -m agents.worker --queue /tmp/kabuten-sweep.db --enqueue
+    python -m agents.worker --queue /tmp/kabuten-sweep.db   # on other processes/nodes
+    python -m agents.worker --enqueue --triggered --seed data/seed.json --history data/history
+
+Results are applied to sector threads by KabutenOrchestrator.collect().
+"""
+
+import argparse
+import asyncio
+
+from agents import encoding
+from agents.budget import TokenBudget
+from agents.company_agent import CompanyFinding
+from agents.config import SECTORS
+from agents.sector_agent import SectorLeadAgent
+from agents.work_queue import SQLiteWorkQueue, WorkQueue, WorkUnit, default_worker_id
+
+
+async def execute_unit(
+    unit: WorkUnit,
+    agent: SectorLeadAgent,
+    queue: WorkQueue,
+    budget: TokenBudget | None = None,
+) -> bytes:
+    """Run a single unit, charging `budget` (default: the agent's), and return its result as encoded JSON."""
+    budget = budget or agent.budget
+    if unit.kind == "company":
+        finding = await agent.sweep_company(unit.ticker, budget)
+        return finding.to_json()
+
+    if unit.kind == "sector":
+        results = queue.results(unit.run_id, "company", unit.sector_key)
+        findings = [
+            CompanyFinding.from_dict(results[(unit.sector_key, c.ticker)])
+            for c in agent.sector.companies
+            if (unit.sector_key, c.ticker) in results
+        ]
+        missing = [
+            u.ticker for u in queue.dead_letters(unit.run_id)
+            if u.kind == "company" and u.sector_key == unit.sector_key
+        ]
+        synthesis, sweep_entry = await agent.synthesise_sweep(
+            findings, run_id=unit.run_id, budget=budget.for_sector(unit.sector_key), missing=missing,
+            # Never dead-letter a sector's findings: the last attempt rolls them up locally
+            fallback_on_error=unit.attempts >= queue.max_attempts,
+        )
+        return encoding.splice({"sweep_entry": sweep_entry}, synthesis=synthesis.to_json())
+
+    raise ValueError(f"Unknown work unit kind '{unit.kind}'")
+
+
+async def run_worker(
+    queue: WorkQueue,
+    worker_id: str | None = None,
+    visibility_timeout: float = 900.0,
+    poll_interval: float = 2.0,
+    exit_when_idle: bool = True,
+    run_cap: int | None = None,
+    sector_cap: int | None = None,
+) -> int:
+    """Lease and execute units until the queue is drained. Returns number of units acked.
+
+    Each run's units are charged to a per-run TokenBudget with `run_cap` and
+    `sector_cap`; the caps bound this worker's spend, not that of the whole
+    fleet. Spend per run is printed when the worker exits.
+    """
+    worker_id = worker_id or default_worker_id()
+    agents: dict[str, SectorLeadAgent] = {}
+    budgets: dict[str, TokenBudget] = {}
+    processed = 0
+
+    try:
+        while True:
+            # Whichever worker settles a sector's last company unit schedules its synthesis
+            for run_id, sector_key in queue.ready_sectors():
+                queue.enqueue(run_id, "sector", sector_key)
+
+            unit = queue.lease(worker_id, visibility_timeout)
+            if unit is None:
+                if exit_when_idle:
+                    return processed
+                await asyncio.sleep(poll_interval)
+                continue
+
+            sector = SECTORS.get(unit.sector_key)
+            if sector is None:
+                queue.nack(unit, f"Unknown sector key '{unit.sector_key}'")
+                continue
+            agent = agents.setdefault(unit.sector_key, SectorLeadAgent(sector))
+            budget = budgets.get(unit.run_id)
+            if budget is None:
+                budget = budgets[unit.run_id] = TokenBudget(run_cap=run_cap, sector_cap=sector_cap)
+
+            try:
+                result = await execute_unit(unit, agent, queue, budget)
+            except Exception as exc:
+                print(f"[{worker_id}] {unit.kind} unit {unit.sector_key}/{unit.ticker} failed: {exc}")
+                queue.nack(unit, repr(exc))
+                continue
+            queue.ack(unit, result)
+            processed += 1
+    finally:
+        for run_id, budget in budgets.items():
+            print(f"[{worker_id}] {run_id}: {budget.format_report()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a Kabuten sweep queue worker.")
+    parser.add_argument("--queue", default="kabuten-sweep.db", help="SQLite queue path")
+    parser.add_argument("--enqueue", action="store_true", help="enqueue a sweep run before working")
+    parser.add_argument("--run-id", default=None, help="run id to enqueue (default: today's run)")
+    parser.add_argument(
+        "--triggered", action="store_true",
+        help="enqueue only triggered and rotation-due companies (see agents.triggers)",
+    )
+    parser.add_argument("--seed", default=None, help="with --triggered: seed file to read earnings dates from")
+    parser.add_argument("--history", default=None, help="with --triggered: findings store directory (stale trigger)")
+    parser.add_argument("--visibility-timeout", type=float, default=900.0)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--run-cap", type=int, default=None, help="token cap per run for this worker")
+    parser.add_argument("--sector-cap", type=int, default=None, help="token cap per sector per run for this worker")
+    parser.add_argument("--forever", action="store_true", help="keep polling when the queue is empty")
+    args = parser.parse_args()
+
+    queue = SQLiteWorkQueue(args.queue, max_attempts=args.max_attempts)
+    if args.enqueue:
+        from agents.orchestrator import KabutenOrchestrator
+        selection = None
+        if args.triggered:
+            from agents.history import FindingsStore
+            from agents.triggers import TriggerEngine, latest_snapshots, load_earnings_calendar
+            current, previous = latest_snapshots()
+            engine = TriggerEngine(
+                calendar=load_earnings_calendar(args.seed) if args.seed else None,
+                history=FindingsStore(args.history) if args.history else None,
+            )
+            selection = engine.select(current=current, previous=previous)
+            print(selection.summary())
+        run_id = KabutenOrchestrator().enqueue_sweep(queue, args.run_id, selection)
+        print(f"Enqueued {run_id}: {queue.counts(run_id)}")
+
+    processed = asyncio.run(run_worker(
+        queue,
+        visibility_timeout=args.visibility_timeout,
+        exit_when_idle=not args.forever,
+        run_cap=args.run_cap,
+        sector_cap=args.sector_cap,
+    ))
+    print(f"Processed {processed} units")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,15 @@ the companies table (market_cap_usd column, in USD billions).
 
 Handles local-currency conversion: KRW, TWD, JPY, HKD, CNY, AUD, INR → USD.
 
+Also writes a dated local snapshot (market cap, last price, volume vs 3-month
+average) to data/market_snapshots/YYYY-MM-DD.json for the sweep trigger engine
+(agents/triggers.py).
+
 Run: python3 scripts/update_market_caps.py
 """
 
-import os, sys, time
+import os, sys, time, json
+from datetime import date
 import yfinance as yf
 import psycopg2
 from dotenv import dotenv_values
@@ -67,6 +72,7 @@ BATCH = 40
 
 updates = []
 errors  = []
+snapshot: dict[str, dict] = {}
 
 for i in range(0, len(companies), BATCH):
     batch = companies[i:i+BATCH]
@@ -85,6 +91,12 @@ for i in range(0, len(companies), BATCH):
                     fx = FX_RATES.get(currency, FX_RATES.get("USD", 1.0))
                     mc_usd_bn = round(mc_local * fx / 1e9, 2)
                     updates.append((mc_usd_bn, id_map[ticker]))
+                    snapshot[id_map[ticker]] = {
+                        "market_cap_usd": mc_usd_bn,
+                        "price": getattr(fi, "last_price", None),
+                        "volume": getattr(fi, "last_volume", None),
+                        "avg_volume": getattr(fi, "three_month_average_volume", None),
+                    }
                     print(f"  {ticker:<22} {currency}  ${mc_usd_bn:>10,.1f}B")
                 else:
                     errors.append(ticker)
@@ -98,6 +110,14 @@ for i in range(0, len(companies), BATCH):
 
     time.sleep(1)
 
+# ── Write local snapshot for the sweep trigger engine ─────────────────────────
+snapshot_dir = os.path.join(os.path.dirname(__file__), "../data/market_snapshots")
+os.makedirs(snapshot_dir, exist_ok=True)
+snapshot_path = os.path.join(snapshot_dir, f"{date.today().isoformat()}.json")
+with open(snapshot_path, "w") as fh:
+    json.dump({"as_of": date.today().isoformat(), "companies": snapshot}, fh, indent=1)
+print(f"\nWrote snapshot for {len(snapshot)} companies → {os.path.relpath(snapshot_path)}")
+
 # ── Upsert into DB ────────────────────────────────────────────────────────────
 print(f"\nUpserting {len(updates)} values into DB…")
 cur.executemany(
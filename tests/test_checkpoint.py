@@ -0,0 +1,44 @@
+from agents.checkpoint import RunManifest
+from agents.company_agent import CompanyFinding
+
+
+def _finding(ticker: str) -> CompanyFinding:
+    return CompanyFinding(
+        ticker=ticker,
+        company_name=f"{ticker} Corp",
+        finding_type="incremental",
+        headline=f"{ticker} headline",
+        detail="detail",
+        signal="bullish",
+        category="earnings",
+        requires_escalation=False,
+        assessment="assessment",
+    )
+
+
+def test_replay_drops_torn_final_line(tmp_path):
+    manifest = RunManifest(str(tmp_path), "run-1")
+    manifest.record_selection({"semis": ["AAA", "BBB"]})
+    manifest.record_finding("semis", _finding("AAA"))
+    manifest.record_finding("semis", _finding("BBB"))
+
+    # Simulate a crash part-way through appending a third record
+    with open(manifest.path, "rb") as fh:
+        intact = fh.read()
+    with open(manifest.path, "ab") as fh:
+        fh.write(b'{"unit": "company", "sector_key": "semis", "finding": {"tick')
+
+    resumed = RunManifest(str(tmp_path), "run-1")
+    assert resumed.finding("semis", "AAA") == _finding("AAA")
+    assert resumed.finding("semis", "BBB") == _finding("BBB")
+    assert resumed.scheduled == {"semis": ["AAA", "BBB"]}
+    assert not resumed.complete
+    with open(resumed.path, "rb") as fh:
+        assert fh.read() == intact
+
+    # New records start on a clean line and survive the next replay
+    resumed.record_finding("semis", _finding("CCC"))
+    resumed.mark_complete()
+    reopened = RunManifest(str(tmp_path), "run-1")
+    assert reopened.finding("semis", "CCC") == _finding("CCC")
+    assert reopened.complete
@@ -0,0 +1,45 @@
+import os
+from datetime import date
+
+from agents.company_agent import CompanyFinding
+from agents.history import FindingsStore
+
+
+def _finding(ticker: str, signal: str) -> CompanyFinding:
+    return CompanyFinding(
+        ticker=ticker,
+        company_name=f"{ticker} Corp",
+        finding_type="incremental",
+        headline="",
+        detail="",
+        signal=signal,
+        category="earnings",
+        requires_escalation=False,
+        assessment="",
+    )
+
+
+def test_load_truncates_ragged_columns(tmp_path):
+    store = FindingsStore(str(tmp_path))
+    store.record_sweep("semis", [_finding("AAA", "bullish")], "bullish", 7.0, on=date(2026, 1, 5))
+    store.record_sweep("semis", [_finding("AAA", "bullish")], "bullish", 6.0, on=date(2026, 1, 6))
+
+    # A crash mid-flush: one column got a full extra row, another half a row
+    with open(tmp_path / "findings.day.bin", "ab") as fh:
+        fh.write(date(2026, 1, 7).toordinal().to_bytes(4, "little"))
+    with open(tmp_path / "findings.signal.bin", "ab") as fh:
+        fh.write(b"\x01\x00")
+
+    reloaded = FindingsStore(str(tmp_path))
+    assert len(reloaded) == 2
+    assert {len(v) for v in reloaded._findings.columns.values()} == {2}
+    for col in ("day", "signal", "ticker"):
+        assert os.path.getsize(tmp_path / f"findings.{col}.bin") == 2 * 4
+    streak = reloaded.streak("AAA", as_of=date(2026, 1, 6))
+    assert (streak.value, streak.observations) == ("bullish", 2)
+
+    # Appends after recovery line up across every column
+    reloaded.record_sweep("semis", [_finding("AAA", "bearish")], "bearish", 4.0, on=date(2026, 1, 7))
+    again = FindingsStore(str(tmp_path))
+    assert len(again) == 3
+    assert [s for _, s, _, _ in again.ticker_history("AAA")] == ["bullish", "bullish", "bearish"]
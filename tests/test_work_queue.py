@@ -0,0 +1,54 @@
+import time
+
+from agents.work_queue import SQLiteWorkQueue
+
+
+def test_expired_lease_is_retried_then_dead_lettered(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.enqueue("run-1", "company", "semis", "AAA")
+
+    first = queue.lease("w1", visibility_timeout=0.05)
+    assert first.attempts == 1
+    assert queue.lease("w2", visibility_timeout=0.05) is None  # still leased
+
+    time.sleep(0.1)
+    second = queue.lease("w2", visibility_timeout=0.05)
+    assert (second.id, second.attempts) == (first.id, 2)
+
+    # The stale worker's nack no longer owns the lease
+    queue.nack(first, "too late")
+    assert queue.counts("run-1") == {"leased": 1}
+
+    time.sleep(0.1)
+    assert queue.lease("w3", visibility_timeout=0.05) is None
+    assert queue.counts("run-1") == {"dead": 1}
+    [dead] = queue.dead_letters("run-1")
+    assert (dead.ticker, dead.attempts) == ("AAA", 2)
+    assert queue.ready_sectors() == [("run-1", "semis")]
+    queue.close()
+
+
+def test_nack_dead_letters_at_max_attempts(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.enqueue("run-1", "company", "semis", "AAA")
+    queue.enqueue("run-1", "company", "semis", "BBB")
+
+    unit = queue.lease("w1", visibility_timeout=30)
+    queue.nack(unit, "boom")
+    assert queue.counts("run-1") == {"pending": 2}
+
+    retry = queue.lease("w1", visibility_timeout=30)
+    assert (retry.id, retry.attempts) == (unit.id, 2)
+    queue.nack(retry, "boom again")
+    assert [u.ticker for u in queue.dead_letters("run-1")] == ["AAA"]
+    assert queue.ready_sectors() == []  # BBB is still pending
+
+    other = queue.lease("w1", visibility_timeout=30)
+    assert other.ticker == "BBB"
+    queue.ack(other, {"ticker": other.ticker})
+    assert queue.counts("run-1") == {"dead": 1, "done": 1}
+    assert queue.ready_sectors() == [("run-1", "semis")]
+
+    assert queue.enqueue("run-1", "sector", "semis")
+    assert queue.ready_sectors() == []
+    queue.close()